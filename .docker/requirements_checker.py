@@ -1,6 +1,7 @@
 import importlib
 import pkgutil
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 project_root = Path(__file__).resolve().parent.parent
@@ -8,6 +9,7 @@ sys.path.append(str(project_root))
 
 package_name = "mesh.agents"
 modules_checked = 0
+total_modules = 0
 
 try:
     package = importlib.import_module(package_name)
@@ -20,9 +22,18 @@ try:
         print("No modules found. ✅")
         sys.exit(0)
 
-    for _, module_name, _ in non_pkg_modules:
-        importlib.import_module(f"{package_name}.{module_name}")
-        modules_checked += 1
+    # imports are dominated by file I/O of their dependencies, so threads overlap them well
+    executor = ThreadPoolExecutor(max_workers=8)
+    try:
+        futures = [
+            executor.submit(importlib.import_module, f"{package_name}.{module_name}")
+            for _, module_name, _ in non_pkg_modules
+        ]
+        for future in as_completed(futures):
+            future.result()
+            modules_checked += 1
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
     print(f"✅ All {modules_checked} modules imported successfully.")
     sys.exit(0)
@@ -1,17 +1,20 @@
 #!/usr/bin/env python3
 import argparse
 import ast
-import copy
+import concurrent.futures
+import hashlib
+import io
 import json
 import logging
 import os
-import re
+import pickle
 import sys
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Dict
 
 import boto3  # type: ignore since it's only for github actions
+import orjson
 import requests
 
 logging.basicConfig(
@@ -21,52 +24,118 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
+# bump when the extractor or the AST shape it relies on changes, so stale cache entries are ignored
+SCHEMA_VERSION = "1"
+AST_CACHE_DIR = Path(".cache/mesh-ast")
+_ast_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _load_ast_cached(path: Path, src: bytes | None = None) -> ast.AST:
+    """Parse a source file, reusing a pickled AST from a previous run if the contents are unchanged."""
+    if src is None:
+        with open(path, "rb") as f:
+            src = f.read()
+
+    # the same raw bytes feed both the cache key and the parser, which handles the decoding itself
+    hasher = hashlib.sha256(f"{SCHEMA_VERSION}:{sys.version_info[:2]}:".encode())
+    hasher.update(src)
+    digest = hasher.hexdigest()
+    cache_file = AST_CACHE_DIR / f"{digest}.pkl"
+
+    if cache_file.exists():
+        try:
+            with open(cache_file, "rb") as f:
+                tree = pickle.load(f)
+            _ast_cache_stats["hits"] += 1
+            return tree
+        except Exception as e:
+            log.warning(f"Ignoring unreadable AST cache entry {cache_file}: {e}")
+
+    tree = ast.parse(src, filename=str(path))
+    _ast_cache_stats["misses"] += 1
+    try:
+        AST_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp")
+        with open(tmp_file, "wb") as f:
+            pickle.dump(tree, f, protocol=5)
+        tmp_file.replace(cache_file)
+    except Exception as e:
+        log.warning(f"Failed to write AST cache entry for {path}: {e}")
+    return tree
+
 
 # this is to get the base agent metadata structure, from mesh/mesh_agent.py
 # we don't directly import it because we don't want to load all the dependencies
 # of the mesh_agent.py file just to extract its metadata
+def _handle_name(node: ast.Name, default_model_id=None):
+    if node.id == "DEFAULT_MODEL_ID" and default_model_id is not None:
+        return default_model_id
+    if log.isEnabledFor(logging.WARNING):
+        log.warning("Skipping unsupported ast.Name: %s", node.id)
+    return f"UNSUPPORTED_AST_NAME_{node.id}"
+
+
+def _handle_attribute(node: ast.Attribute, default_model_id=None):
+    # handle self.agent_name specifically as a placeholder
+    if isinstance(node.value, ast.Name) and node.value.id == "self" and node.attr == "agent_name":
+        return ""  # placeholder, will be overwritten by actual agent name later
+    # ast.dump walks the whole subtree, only pay for it when the warning is actually emitted
+    if log.isEnabledFor(logging.WARNING):
+        log.warning("Skipping unsupported ast.Attribute: %s", ast.dump(node))
+    return "UNSUPPORTED_AST_ATTRIBUTE"
+
+
+def _handle_unsupported(node: ast.AST, default_model_id=None):
+    if log.isEnabledFor(logging.WARNING):
+        log.warning("Skipping unsupported node type during conversion: %s", type(node))
+    return f"UNSUPPORTED_AST_NODE_{type(node).__name__}"
+
+
+# exact-type dispatch for the leaves that aren't handled inline by the converter
+_HANDLERS = {
+    ast.Name: _handle_name,
+    ast.Attribute: _handle_attribute,
+}
+
+
 def _convert_ast_node_to_python(node, default_model_id=None):
-    """Helper to convert various AST nodes to Python equivalents."""
-    if isinstance(node, ast.Constant):
-        return node.value
-    elif isinstance(node, ast.List):
-        # pass default_model_id down recursively
-        return [_convert_ast_node_to_python(item, default_model_id) for item in node.elts]
-    elif isinstance(node, ast.Dict):
-        # pass default_model_id down recursively
-        return _convert_ast_dict_to_python_dict(node, default_model_id)
-    elif isinstance(node, ast.Name):
-        if node.id == "DEFAULT_MODEL_ID" and default_model_id is not None:
-            return default_model_id
-        else:
-            log.warning(f"Skipping unsupported ast.Name: {node.id}")
-            return f"UNSUPPORTED_AST_NAME_{node.id}"
-    elif isinstance(node, ast.Attribute):
-        # handle self.agent_name specifically as a placeholder
-        if isinstance(node.value, ast.Name) and node.value.id == "self" and node.attr == "agent_name":
-            return ""  # placeholder, will be overwritten by actual agent name later
+    """Helper to convert various AST nodes to Python equivalents.
+
+    Constants, lists and dicts are converted inline with an explicit stack instead of recursion, each
+    pending node carrying the container and slot its value gets written to.
+    """
+    root = [None]
+    stack = [(node, root, 0)]
+    while stack:
+        current, parent, slot = stack.pop()
+        node_type = type(current)
+        if node_type is ast.Constant:
+            parent[slot] = current.value
+        elif node_type is ast.List:
+            items = [None] * len(current.elts)
+            parent[slot] = items
+            # pushed in reverse so children are converted in source order
+            stack.extend((current.elts[i], items, i) for i in range(len(current.elts) - 1, -1, -1))
+        elif node_type is ast.Dict:
+            result = {}
+            parent[slot] = result
+            pending = []
+            for k, v in zip(current.keys, current.values):
+                if type(k) is not ast.Constant:
+                    if log.isEnabledFor(logging.WARNING):
+                        log.warning("Skipping non-constant key in base metadata dict: %s", type(k))
+                    continue
+                result[k.value] = None  # reserve the slot to keep key order
+                pending.append((v, result, k.value))
+            stack.extend(reversed(pending))
         else:
-            log.warning(f"Skipping unsupported ast.Attribute: {ast.dump(node)}")
-            return "UNSUPPORTED_AST_ATTRIBUTE"
-    else:
-        log.warning(f"Skipping unsupported node type during conversion: {type(node)}")
-        return f"UNSUPPORTED_AST_NODE_{type(node).__name__}"
+            parent[slot] = _HANDLERS.get(node_type, _handle_unsupported)(current, default_model_id)
+    return root[0]
 
 
 def _convert_ast_dict_to_python_dict(node: ast.Dict, default_model_id=None) -> dict:
     """Converts an ast.Dict node to a Python dictionary."""
-    result = {}
-    for k, v in zip(node.keys, node.values):
-        key = None
-        if isinstance(k, ast.Constant):
-            key = k.value
-        else:
-            log.warning(f"Skipping non-constant key in base metadata dict: {type(k)}")
-            continue
-
-        # pass default_model_id down
-        result[key] = _convert_ast_node_to_python(v, default_model_id)
-    return result
+    return _convert_ast_node_to_python(node, default_model_id)
 
 
 def extract_base_metadata(mesh_agent_path: Path) -> dict:
@@ -75,8 +144,7 @@ def extract_base_metadata(mesh_agent_path: Path) -> dict:
     base_metadata_dict = {}
 
     try:
-        with open(mesh_agent_path, "r", encoding="utf-8") as f:
-            tree = ast.parse(f.read())
+        tree = _load_ast_cached(mesh_agent_path)
 
         # first pass: find default_model_id at module level
         for node in ast.iter_child_nodes(tree):
@@ -90,42 +158,42 @@ def extract_base_metadata(mesh_agent_path: Path) -> dict:
                         log.warning("DEFAULT_MODEL_ID assignment is not a simple constant.")
                         break
 
-        # second pass: find meshagent class and extract metadata
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef) and node.name == "MeshAgent":
-                for item in node.body:
-                    if isinstance(item, ast.FunctionDef) and item.name == "__init__":
-                        for stmt in item.body:
-                            # look for self.metadata = { ... } or self.metadata: type = { ... }
-                            is_assign = isinstance(stmt, ast.Assign)
-                            is_annassign = isinstance(stmt, ast.AnnAssign)
-
-                            target = None
-                            value = None
-                            if is_assign and len(stmt.targets) == 1:
-                                target = stmt.targets[0]
-                                value = stmt.value
-                            elif is_annassign:
-                                target = stmt.target
-                                value = stmt.value
-
-                            # check if we found an assignment and if it's self.metadata = {dict}
-                            if (
-                                target is not None
-                                and value is not None
-                                and isinstance(target, ast.Attribute)
-                                and isinstance(target.value, ast.Name)
-                                and target.value.id == "self"
-                                and target.attr == "metadata"
-                                and isinstance(value, ast.Dict)
-                            ):
-                                # pass the found default_model_id to the converter
-                                base_metadata_dict = _convert_ast_dict_to_python_dict(value, default_model_id)
-                                break  # found metadata, exit inner loops
-                        if base_metadata_dict:
-                            break  # found metadata, exit outer loop
-                if base_metadata_dict:
-                    break  # found metadata, exit class search
+        # second pass: find meshagent class and extract metadata, it's always defined at module level
+        for node in ast.iter_child_nodes(tree):
+            if not (isinstance(node, ast.ClassDef) and node.name == "MeshAgent"):
+                continue
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef) and item.name == "__init__":
+                    for stmt in item.body:
+                        # look for self.metadata = { ... } or self.metadata: type = { ... }
+                        is_assign = isinstance(stmt, ast.Assign)
+                        is_annassign = isinstance(stmt, ast.AnnAssign)
+
+                        target = None
+                        value = None
+                        if is_assign and len(stmt.targets) == 1:
+                            target = stmt.targets[0]
+                            value = stmt.value
+                        elif is_annassign:
+                            target = stmt.target
+                            value = stmt.value
+
+                        # check if we found an assignment and if it's self.metadata = {dict}
+                        if (
+                            target is not None
+                            and value is not None
+                            and isinstance(target, ast.Attribute)
+                            and isinstance(target.value, ast.Name)
+                            and target.value.id == "self"
+                            and target.attr == "metadata"
+                            and isinstance(value, ast.Dict)
+                        ):
+                            # pass the found default_model_id to the converter
+                            base_metadata_dict = _convert_ast_dict_to_python_dict(value, default_model_id)
+                            break  # found metadata, exit inner loops
+                    if base_metadata_dict:
+                        break  # found metadata, exit outer loop
+            break  # there is only one MeshAgent class
 
         if not base_metadata_dict:
             log.error(
@@ -142,6 +210,21 @@ def extract_base_metadata(mesh_agent_path: Path) -> dict:
         return {}
 
 
+# nodes that can hold statements: statements themselves, except handlers and match cases
+_BLOCK_NODES = (ast.stmt, ast.excepthandler, ast.match_case)
+
+
+def _iter_returns(node: ast.AST):
+    """Yield the Return statements of a function without descending into nested scopes."""
+    stack = list(reversed(node.body))
+    while stack:
+        child = stack.pop()
+        if isinstance(child, ast.Return):
+            yield child
+        elif not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            stack.extend(reversed([c for c in ast.iter_child_nodes(child) if isinstance(c, _BLOCK_NODES)]))
+
+
 class AgentMetadataExtractor(ast.NodeVisitor):
     """
     Extract metadata from agent class definitions using AST
@@ -155,75 +238,155 @@ class AgentMetadataExtractor(ast.NodeVisitor):
         self.metadata = {}
         self.current_class = None
         self.found_tools = []
+        # module-level dict and list literals by name, so metadata and tool schemas hoisted to constants resolve
+        self._constants: dict[str, ast.expr] = {}
+        # tool schemas repeat the same short strings ("type", "string", ...) many times, share one object each
+        self._intern: dict[str, str] = {}
 
     def visit_ClassDef(self, node):
         # Only look at classes that end with 'Agent'
         if node.name.endswith("Agent") and node.name != "MeshAgent":
-            self.current_class = node.name
-            self.metadata[node.name] = {"metadata": {}, "tools": []}
-            self.generic_visit(node)
-            self.current_class = None
+            self._process_class(node)
+
+    def _process_class(self, node: ast.ClassDef):
+        self.current_class = node.name
+        self.metadata[node.name] = {"metadata": {}, "tools": []}
+        self.generic_visit(node)
+        self.current_class = None
+
+    def visit_module(self, tree: ast.Module):
+        """Visit only the top-level agent classes of a module, skipping everything else."""
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1:
+                target, value = node.targets[0], node.value
+            elif isinstance(node, ast.AnnAssign):
+                target, value = node.target, node.value
+            else:
+                continue
+            if isinstance(target, ast.Name) and isinstance(value, (ast.Dict, ast.List)):
+                self._constants[target.id] = value
+
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef) and node.name.endswith("Agent") and node.name != "MeshAgent":
+                self._process_class(node)
 
     def visit_Call(self, node):
         if not self.current_class:
             return
 
-        # Look for self.metadata.update() calls
-        if (
-            isinstance(node.func, ast.Attribute)
-            and isinstance(node.func.value, ast.Attribute)
-            and isinstance(node.func.value.value, ast.Name)
-            and node.func.value.value.id == "self"
-            and node.func.value.attr == "metadata"
-            and node.func.attr == "update"
-        ):
-            # Extract the dictionary from the update call
-            if node.args and isinstance(node.args[0], ast.Dict):
-                metadata = self._extract_dict(node.args[0])
-                self.metadata[self.current_class]["metadata"].update(metadata)
-
-        self.generic_visit(node)
+        # Look for self.metadata.update() calls, comparing the attribute names first since
+        # they rule out almost every other call
+        func = node.func
+        if type(func) is not ast.Attribute or func.attr != "update":
+            return self.generic_visit(node)
+        target = func.value
+        if type(target) is not ast.Attribute or target.attr != "metadata":
+            return self.generic_visit(node)
+        owner = target.value
+        if type(owner) is not ast.Name or owner.id != "self":
+            return self.generic_visit(node)
+
+        # Extract the dictionary from the update call, its literal argument has nothing else to visit
+        arg = self._resolve(node.args[0]) if node.args else None
+        if isinstance(arg, ast.Dict):
+            metadata = self._extract_dict(arg)
+            self.metadata[self.current_class]["metadata"].update(metadata)
 
     def visit_FunctionDef(self, node):
         if not self.current_class:
             return
 
         if node.name == "get_tool_schemas":
-            for child in ast.walk(node):
-                if isinstance(child, ast.Return):
-                    if isinstance(child.value, ast.List):
-                        tools = []
-                        for elt in child.value.elts:
-                            if isinstance(elt, ast.Dict):
-                                tool = self._extract_dict(elt)
-                                tools.append(tool)
-                        self.metadata[self.current_class]["tools"] = tools
+            for child in _iter_returns(node):
+                value = self._resolve(child.value)
+                if isinstance(value, ast.List):
+                    tools = []
+                    for elt in value.elts:
+                        if isinstance(elt, ast.Dict):
+                            tool = self._extract_dict(elt)
+                            tools.append(tool)
+                    self.metadata[self.current_class]["tools"] = tools
+                    break
+            # the schema method holds no metadata.update() calls, no need to descend further
+            return
 
         self.generic_visit(node)
 
+    def _resolve(self, node: ast.expr | None) -> ast.expr | None:
+        """Follow a bare name to the module-level literal assigned to it, other nodes are returned as is."""
+        if type(node) is ast.Name:
+            return self._constants.get(node.id, node)
+        return node
+
     def _extract_dict(self, node: ast.Dict) -> dict:
         result = {}
+        intern = self._intern
         for k, v in zip(node.keys, node.values):
-            if not isinstance(k, ast.Constant):
+            if type(k) is not ast.Constant:
                 continue
-            key = k.value
-            if isinstance(v, ast.Constant):
-                result[key] = v.value
-            elif isinstance(v, ast.List):
-                result[key] = [
-                    self._extract_dict(item)
-                    if isinstance(item, ast.Dict)
-                    else item.value
-                    if isinstance(item, ast.Constant)
-                    else None
-                    for item in v.elts
-                ]
-            elif isinstance(v, ast.Dict):
-                result[key] = self._extract_dict(v)
+            handler = self._VALUE_HANDLERS.get(type(v))
+            if handler is not None:
+                key = k.value
+                if type(key) is str:
+                    key = intern.setdefault(key, key)
+                result[key] = handler(self, v)
         return result
 
+    def _extract_constant(self, node: ast.Constant):
+        value = node.value
+        if type(value) is str:
+            return self._intern.setdefault(value, value)
+        return value
+
+    def _extract_list(self, node: ast.List) -> list:
+        return [
+            self._extract_dict(item)
+            if type(item) is ast.Dict
+            else self._extract_constant(item)
+            if type(item) is ast.Constant
+            else None
+            for item in node.elts
+        ]
+
+    _VALUE_HANDLERS = {
+        ast.Constant: _extract_constant,
+        ast.List: _extract_list,
+        ast.Dict: _extract_dict,
+    }
+
+
+# byte substrings every publishable agent module contains, checked before parsing
+_REQUIRED_AGENT_MARKERS = (b"class ", b"Agent", b"get_tool_schemas", b"self.metadata")
+
+
+def _parse_one(path: str) -> tuple[str, dict, bool | None]:
+    """Parse a single agent file in a worker process.
+
+    Returns the module name, the extracted per-class metadata and whether the AST came from the cache
+    (None if the file was skipped without parsing).
+    """
+    file_path = Path(path)
+    hits_before = _ast_cache_stats["hits"]
+    try:
+        with open(file_path, "rb") as f:
+            src = f.read()
+        # files without an agent class, its metadata and tools can't contribute anything, and the
+        # echo agent is never published, so don't bother parsing them
+        if not all(needle in src for needle in _REQUIRED_AGENT_MARKERS) or b"class EchoAgent" in src:
+            return file_path.stem, {}, None
+
+        tree = _load_ast_cached(file_path, src)
+        extractor = AgentMetadataExtractor()
+        extractor.visit_module(tree)
+        return file_path.stem, extractor.metadata, _ast_cache_stats["hits"] > hits_before
+    except Exception as e:
+        log.warning(f"Error parsing {file_path}: {e}")
+        return file_path.stem, {}, None
+
 
 class MetadataManager:
+    __slots__ = ("s3_client", "base_metadata", "_base_metadata_json")
+
     def __init__(self):
         # Only initialize S3 client if all required env vars are present
         if all(k in os.environ for k in ["S3_ENDPOINT", "S3_ACCESS_KEY", "S3_SECRET_KEY"]):
@@ -242,12 +405,23 @@ class MetadataManager:
         self.base_metadata = extract_base_metadata(mesh_agent_file)
         if not self.base_metadata:
             raise ValueError("Failed to extract base metadata")
+        # base metadata is plain JSON data, so a json round-trip is a much cheaper deep copy than copy.deepcopy
+        self._base_metadata_json = json.dumps(self.base_metadata, separators=(",", ":"))
 
     def fetch_existing_metadata(self) -> Dict:
+        # S3 is the source of truth, and reading through the same client warms up its
+        # connection pool for the put_object that follows
+        if self.s3_client:
+            try:
+                response = self.s3_client.get_object(Bucket="mesh", Key="metadata.json")
+                return orjson.loads(response["Body"].read())
+            except Exception as e:
+                log.warning(f"Failed to read existing metadata from S3, falling back to HTTPS: {e}")
+
         try:
             response = requests.get("https://mesh.heurist.ai/metadata.json")
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
             log.warning(f"Failed to fetch existing metadata: {e}")
             return {"agents": {}}
@@ -258,52 +432,62 @@ class MetadataManager:
             log.error("Mesh directory not found")
             return {}
 
-        agents_dict = {}
-        for file_path in mesh_dir.glob("*_agent.py"):
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    tree = ast.parse(f.read())
-
-                extractor = AgentMetadataExtractor()
-                extractor.visit(tree)
-
-                for agent_id, data in extractor.metadata.items():
-                    if "EchoAgent" in agent_id:
-                        continue
-
-                    agent_base_meta = copy.deepcopy(self.base_metadata)
-                    agent_data = {
-                        "metadata": {**agent_base_meta, **(data.get("metadata", {}))},
-                        "module": file_path.stem,
-                        "tools": data.get("tools", []),
-                    }
-
-                    if agent_data["tools"]:
-                        tool_names = ", ".join(t["function"]["name"] for t in agent_data["tools"])
-                        if isinstance(agent_data["metadata"].get("inputs"), list):
-                            agent_data["metadata"]["inputs"].extend(
-                                [
-                                    {
-                                        "name": "tool",
-                                        "description": f"Directly specify which tool to call: {tool_names}. Bypasses LLM.",
-                                        "type": "str",
-                                        "required": False,
-                                    },
-                                    {
-                                        "name": "tool_arguments",
-                                        "description": "Arguments for the tool call as a dictionary",
-                                        "type": "dict",
-                                        "required": False,
-                                        "default": {},
-                                    },
-                                ]
-                            )
-
-                    agents_dict[agent_id] = agent_data
-
-            except Exception as e:
-                log.warning(f"Error parsing {file_path}: {e}")
+        paths = [str(p) for p in sorted(mesh_dir.glob("*_agent.py"))]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = list(executor.map(_parse_one, paths, chunksize=4))
 
+        agents_dict = {}
+        missing_tools = []
+        missing_metadata = []
+        for module_name, extracted, cache_hit in results:
+            if cache_hit is not None:
+                _ast_cache_stats["hits" if cache_hit else "misses"] += 1
+            for agent_id, data in extracted.items():
+                if "EchoAgent" in agent_id:
+                    continue
+
+                agent_base_meta = json.loads(self._base_metadata_json)
+                agent_data = {
+                    "metadata": {**agent_base_meta, **(data.get("metadata", {}))},
+                    "module": module_name,
+                    "tools": data.get("tools", []),
+                }
+
+                if agent_data["tools"]:
+                    tool_names = ", ".join(t["function"]["name"] for t in agent_data["tools"])
+                    if isinstance(agent_data["metadata"].get("inputs"), list):
+                        agent_data["metadata"]["inputs"].extend(
+                            [
+                                {
+                                    "name": "tool",
+                                    "description": f"Directly specify which tool to call: {tool_names}. Bypasses LLM.",
+                                    "type": "str",
+                                    "required": False,
+                                },
+                                {
+                                    "name": "tool_arguments",
+                                    "description": "Arguments for the tool call as a dictionary",
+                                    "type": "dict",
+                                    "required": False,
+                                    "default": {},
+                                },
+                            ]
+                        )
+
+                if not agent_data["tools"]:
+                    missing_tools.append(agent_id)
+                if not data.get("metadata", {}).get("description"):
+                    missing_metadata.append(agent_id)
+                agents_dict[agent_id] = agent_data
+
+        # every published agent exposes at least one tool, none found means the extractor missed its schemas
+        if missing_tools:
+            raise ValueError(f"No tool schemas extracted for: {', '.join(sorted(missing_tools))}")
+        # likewise their self.metadata.update() always sets a description
+        if missing_metadata:
+            raise ValueError(f"No agent metadata extracted for: {', '.join(sorted(missing_metadata))}")
+
+        log.info(f"AST cache: {_ast_cache_stats['hits']} hits, {_ast_cache_stats['misses']} misses")
         log.info(f"Found {len(agents_dict)} agents" if agents_dict else "No agents found")
         return agents_dict
 
@@ -335,8 +519,10 @@ class MetadataManager:
         table_header = """| Agent ID | Description | Available Tools | Source Code | External APIs |
 |----------|-------------|-----------------|-------------|---------------|"""
 
-        rows = []
-        for agent_id, agent_data in sorted(metadata["agents"].items()):
+        buf = io.StringIO()
+        buf.write(table_header)
+        agent_items = sorted(metadata["agents"].items())
+        for agent_id, agent_data in agent_items:
             tools = agent_data.get("tools", [])
             tool_names = [f"• {tool['function']['name']}" for tool in tools] if tools else []
             tools_text = "<br>".join(tool_names) if tool_names else "-"
@@ -347,10 +533,11 @@ class MetadataManager:
             module_name = agent_data.get("module", "")
             source_link = f"[Source](./agents/{module_name}.py)" if module_name else "-"
 
-            description = agent_data["metadata"].get("description", "").replace("\n", " ")
-            rows.append(f"| {agent_id} | {description} | {tools_text} | {source_link} | {apis_text} |")
+            # newlines and pipes would break the markdown table row
+            description = agent_data["metadata"].get("description", "").replace("\n", " ").replace("|", "\\|")
+            buf.write(f"\n| {agent_id} | {description} | {tools_text} | {source_link} | {apis_text} |")
 
-        return f"{table_header}\n" + "\n".join(rows)
+        return buf.getvalue()
 
     def update_readme(self, table_content: str) -> None:
         readme_path = Path("mesh/README.md")
@@ -359,17 +546,14 @@ class MetadataManager:
             with open(readme_path, "r", encoding="utf-8") as f:
                 content = f.read()
 
-            section_pattern = r"(## Appendix: All Available Mesh Agents\n)(.*?)(\n---)"
-            if not re.search(section_pattern, content, re.DOTALL):
+            section_header = "## Appendix: All Available Mesh Agents\n"
+            start = content.find(section_header)
+            end = content.find("\n---", start + len(section_header)) if start != -1 else -1
+            if start == -1 or end == -1:
                 log.warning("Could not find '## Appendix: All Available Mesh Agents' section in README")
                 return
 
-            updated_content = re.sub(
-                section_pattern,
-                f"## Appendix: All Available Mesh Agents\n\n{table_content}\n---",
-                content,
-                flags=re.DOTALL,
-            )
+            updated_content = content[:start] + f"{section_header}\n{table_content}" + content[end:]
 
             with open(readme_path, "w", encoding="utf-8") as f:
                 f.write(updated_content)
@@ -386,7 +570,7 @@ class MetadataManager:
             return
 
         try:
-            metadata_json = json.dumps(metadata, indent=2)
+            metadata_json = orjson.dumps(metadata, option=orjson.OPT_INDENT_2)
             self.s3_client.put_object(
                 Bucket="mesh",
                 Key="metadata.json",
@@ -401,8 +585,8 @@ class MetadataManager:
     def write_metadata_local(self, metadata: Dict) -> None:
         """Write metadata to a local file"""
         try:
-            metadata_json = json.dumps(metadata, indent=2)
-            with open("metadata.json", "w", encoding="utf-8") as f:
+            metadata_json = orjson.dumps(metadata, option=orjson.OPT_INDENT_2)
+            with open("metadata.json", "wb") as f:
                 f.write(metadata_json)
             log.info("Wrote metadata to local file metadata.json")
         except Exception as e:
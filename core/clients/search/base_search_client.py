@@ -15,12 +15,20 @@ class BaseSearchClient(ABC):
         self.api_url = api_url
         self.rate_limit = rate_limit
         self._last_request_time = 0  # Track the last request time
+        self._http_session = None  # Optional pooled aiohttp session shared by the caller
 
     @abstractmethod
     async def search(self, query: str, timeout: int = 15000) -> SearchResponse:
         """Execute a search query and return formatted results."""
         pass
 
+    def set_http_session(self, session) -> None:
+        """
+        Share a pooled aiohttp session with this client so connections are reused across searches.
+        Clients that go through a third-party SDK keep their own transport and ignore it.
+        """
+        self._http_session = session
+
     async def _apply_rate_limiting(self):
         """Apply rate limiting before making a request."""
         current_time = asyncio.get_event_loop().time()
@@ -1,4 +1,7 @@
 import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from duckduckgo_search import DDGS
 
@@ -11,28 +14,56 @@ class DuckDuckGoClient(BaseSearchClient):
     DuckDuckGo is unique among search providers as it doesn't require an API key or custom URL.
     """
 
-    def __init__(self, rate_limit: int = 1):
+    def __init__(self, rate_limit: int = 1, cache_ttl: int = 300, cache_size: int = 256):
         """
         Initialize a DuckDuckGo search client.
 
         Args:
             rate_limit: Rate limit in seconds between requests
+            cache_ttl: Seconds a cached result for a query stays valid
+            cache_size: Maximum number of queries kept in the cache
         """
         # We call the parent constructor with empty strings for api_key and api_url
         # since DuckDuckGo doesn't use these parameters
         super().__init__(api_key="", api_url=None, rate_limit=rate_limit)
+        self._cache: OrderedDict[str, tuple[float, list]] = OrderedDict()
+        self._ttl = cache_ttl
+        self._cache_size = cache_size
+        self._cache_lock = asyncio.Lock()
+        # A dedicated worker thread owns a long-lived DDGS session, so connections are kept alive
+        # between searches and we don't compete with other users of the default executor.
+        # DDGS isn't documented as thread-safe, hence the single worker.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ddg")
+        self._ddgs = DDGS()
+
+    def close(self):
+        """Release the search worker thread."""
+        self._executor.shutdown(wait=False)
 
     async def search(self, query: str, timeout: int = 15000) -> SearchResponse:
         """Search using DuckDuckGo in a thread pool to keep it async."""
+        key = query.strip().lower()
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self._ttl:
+            # Cache hits skip both the network call and the rate limiting
+            self._cache.move_to_end(key)
+            return {"data": cached[1]}
+
         try:
             # Apply rate limiting
             await self._apply_rate_limiting()
 
             # Run the synchronous DDGS call in a thread pool
             # Note: DDGS doesn't accept a timeout parameter for its text() method
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self._perform_search(query, max_results=10)
-            )
+            response = await asyncio.get_running_loop().run_in_executor(self._executor, self._perform_search, query, 10)
+
+            # Empty results usually mean the search failed, so don't keep them around
+            if response:
+                self._cache[key] = (time.monotonic(), response)
+                self._cache.move_to_end(key)
+                async with self._cache_lock:
+                    while len(self._cache) > self._cache_size:
+                        self._cache.popitem(last=False)
 
             return {"data": response}
 
@@ -47,16 +78,15 @@ class DuckDuckGoClient(BaseSearchClient):
         """
         results = []
         try:
-            with DDGS() as ddgs:
-                # DDGS text() doesn't accept a timeout parameter
-                for r in ddgs.text(query, max_results=max_results):
-                    results.append(
-                        {
-                            "url": r["href"],
-                            "markdown": r["body"],
-                            "title": r["title"],
-                        }
-                    )
+            # DDGS text() doesn't accept a timeout parameter
+            for r in self._ddgs.text(query, max_results=max_results):
+                results.append(
+                    {
+                        "url": r["href"],
+                        "markdown": r["body"],
+                        "title": r["title"],
+                    }
+                )
         except Exception as e:
             print(f"DDGS search error: {e}")
 
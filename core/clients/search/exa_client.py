@@ -1,7 +1,6 @@
-import asyncio
 from typing import Optional
 
-import requests
+import aiohttp
 
 from .base_search_client import BaseSearchClient, SearchResponse
 
@@ -20,8 +19,7 @@ class ExaClient(BaseSearchClient):
             # Apply rate limiting
             await self._apply_rate_limiting()
 
-            # Run the API call in a thread pool
-            response = await asyncio.get_event_loop().run_in_executor(None, lambda: self._make_request(query, timeout))
+            response = await self._make_request(query, timeout)
 
             # Format the search results data
             formatted_results = []
@@ -40,11 +38,21 @@ class ExaClient(BaseSearchClient):
             print(f"Error searching with Exa: {e}")
             return {"data": []}
 
-    def _make_request(self, query: str, timeout: int):
-        """Make synchronous request to Exa API."""
+    async def _make_request(self, query: str, timeout: int):
+        """Make request to Exa API, through the shared session if one was provided."""
         url = f"{self.base_url}/search"
         payload = {"query": query, "numResults": 10, "contents": {"text": True}}
 
-        response = requests.post(url, json=payload, headers=self.headers, timeout=timeout / 1000)
-        response.raise_for_status()
-        return response.json()
+        session = self._http_session
+        owns_session = session is None or session.closed
+        if owns_session:
+            session = aiohttp.ClientSession()
+        try:
+            async with session.post(
+                url, json=payload, headers=self.headers, timeout=aiohttp.ClientTimeout(total=timeout / 1000)
+            ) as response:
+                response.raise_for_status()
+                return await response.json()
+        finally:
+            if owns_session:
+                await session.close()
@@ -60,3 +60,13 @@ class SearchClient(BaseSearchClient):
         """
         self.rate_limit = rate_limit
         self._implementation.rate_limit = rate_limit
+
+    def set_http_session(self, session) -> None:
+        """
+        Share a pooled aiohttp session with the wrapped implementation.
+
+        Args:
+            session: aiohttp.ClientSession owned by the caller
+        """
+        self._http_session = session
+        self._implementation.set_http_session(session)
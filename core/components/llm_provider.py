@@ -20,12 +20,36 @@ class LLMProvider:
         large_model_id: str = None,
         small_model_id: str = None,
         tool_manager=None,
+        prompt_caching: bool = None,
     ):
         self.base_url = base_url or os.getenv("HEURIST_BASE_URL")
         self.api_key = api_key or os.getenv("HEURIST_API_KEY")
         self.large_model_id = large_model_id or os.getenv("LARGE_MODEL_ID")
         self.small_model_id = small_model_id or os.getenv("SMALL_MODEL_ID")
         self.tool_manager = tool_manager
+        # whether the endpoint accepts cache_control hints on message content parts
+        if prompt_caching is None:
+            prompt_caching = os.getenv("LLM_PROMPT_CACHING", "false").lower() == "true"
+        self.prompt_caching = prompt_caching
+
+    def _build_messages(self, system_prompt: str, cache_segments: List[Tuple[str, Dict]]) -> Optional[List[Dict]]:
+        """
+        Build chat messages from user prompt segments, each a (text, options) pair where options such as
+        {"cache_control": {"type": "ephemeral"}} mark the end of a prefix the provider may cache.
+        Returns None when the endpoint doesn't support prompt caching, the segments are then sent as one string.
+        """
+        if not self.prompt_caching:
+            return None
+        return [
+            {
+                "role": "system",
+                "content": [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+            },
+            {
+                "role": "user",
+                "content": [{"type": "text", "text": text, **options} for text, options in cache_segments],
+            },
+        ]
 
     async def call(
         self,
@@ -37,12 +61,20 @@ class LLMProvider:
         skip_tools: bool = True,
         tools: List[Dict] = None,
         tool_choice: str = "auto",
+        cache_segments: List[Tuple[str, Dict]] = None,
         **kwargs,
     ) -> Tuple[Optional[str], Optional[str], Optional[Dict]]:
-        """Make a call to the LLM and process the response"""
+        """
+        Make a call to the LLM and process the response.
+        When cache_segments is given it replaces user_prompt, see _build_messages.
+        """
         try:
             # Determine which model to use
             use_model = model_id or self.large_model_id
+            messages = None
+            if cache_segments:
+                messages = self._build_messages(system_prompt, cache_segments)
+                user_prompt = "".join(text for text, _ in cache_segments)
             if not skip_tools and tools:
                 response = await asyncio.to_thread(
                     call_llm_with_tools,
@@ -51,6 +83,7 @@ class LLMProvider:
                     model_id=use_model,
                     system_prompt=system_prompt,
                     user_prompt=user_prompt,
+                    messages=messages,
                     temperature=temperature,
                     max_tokens=max_tokens,
                     tools=tools,
@@ -64,6 +97,7 @@ class LLMProvider:
                     model_id=use_model,
                     system_prompt=system_prompt,
                     user_prompt=user_prompt,
+                    messages=messages,
                     temperature=temperature,
                     max_tokens=max_tokens,
                 )
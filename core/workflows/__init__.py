@@ -5,5 +5,6 @@ Workflow classes for complex agent tasks
 from .augmented_llm import AugmentedLLMCall
 from .chain_of_thought import ChainOfThoughtReasoning
 from .deep_research import ResearchWorkflow
+from .llm_cache import LLMCache
 
-__all__ = ["AugmentedLLMCall", "ChainOfThoughtReasoning", "ResearchWorkflow"]
+__all__ = ["AugmentedLLMCall", "ChainOfThoughtReasoning", "LLMCache", "ResearchWorkflow"]
@@ -1,14 +1,213 @@
 import asyncio
 import json
 import logging
-from dataclasses import dataclass
+import random
+import re
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, TypedDict
+from typing import Callable, Dict, Final, List, Optional, Tuple, TypedDict
+
+import aiohttp
+import orjson
 
 from ..utils.text_splitter import trim_prompt
+from .llm_cache import LLMCache
 
 logger = logging.getLogger(__name__)
 
+_FENCE_RE = re.compile(r"```(?:json)?\s*|\s*```", re.IGNORECASE)
+_JSON_START = re.compile(r"[\{\[]")
+_JSON_DECODER = json.JSONDecoder()
+_NON_WORD_RE = re.compile(r"\W+")
+
+# token budget for each search result's content in the processing prompt
+_MAX_CONTENT_TOKENS: Final[int] = 25000
+
+
+# System prompts are module constants so every call sends the exact same string. Providers that cache
+# prompt prefixes can only reuse their work when this static content comes first and never changes.
+_SYSTEM_PROMPT: Final[str] = """You are an expert research analyst that processes web search results.
+        Analyze the content and provide insights about for each section you identify:
+        1. Key findings and main themes
+        2. Source credibility and diversity
+        3. Information completeness and gaps
+        4. Emerging patterns and trends
+        5. Potential biases or conflicting information
+
+        Be thorough and detailed in your analysis. Focus on extracting concrete facts,
+        statistics, and verifiable information. Highlight any uncertainties or areas
+        needing further research.
+
+        Return your analysis in a clear, structured format with sections for key findings,
+        detailed analysis, and recommendations for further research.
+
+        IMPORTANT: DON'T MAKE ANY INFORMATION UP, IT MUST BE FROM THE CONTENT PROVIDED.
+        FOLLOW THE REQUESTED JSON FORMAT EXACTLY WITH NO ADDITIONAL MARKUP OR COMMENTS."""
+
+_REPORT_SYSTEM_PROMPT: Final[str] = """
+        {
+            "role": "You are an expert researcher specializing in producing exhaustive, analytically rigorous research reports.",
+            "instructions": [
+                "When responding, assume all provided facts—especially those after your knowledge cutoff—are accurate unless contradicted internally.",
+                "The user is a highly experienced analyst. Do not simplify. Prioritize technical precision, domain-specific terminology, and comprehensive argumentation.",
+                "Organize the report with multiple clearly defined sections, such as: Executive Summary, Background, Market Landscape, Problem Analysis, Technological Trends, Competitive Analysis, Risk Factors, Opportunities, Speculative Insights (clearly marked), Strategic Recommendations, and Conclusion.",
+                "Each section should be verbose, detailed, and data-driven where possible. Aim for high information density.",
+                "Anticipate what the user might need to know next. Include frameworks, mental models, and decision trees where relevant.",
+                "Suggest novel or unconventional strategies the user may not have considered. Prioritize unique insight over consensus.",
+                "Include emerging technologies, trends, and contrarian ideas. Be aggressive in surfacing innovations, and clearly identify areas of high uncertainty or risk.",
+                "Do not cite sources by name unless necessary—strong reasoning is preferred over appeal to authority.",
+                "You may speculate about future developments, but you must clearly mark any speculative or high-uncertainty claims.",
+                "Use precise definitions, models, and numerical reasoning where appropriate.",
+                "Provide critical evaluation of ideas, trade-offs, and second-order consequences.",
+                "When delivering the report, ALWAYS return a single, clean JSON object and NOTHING ELSE.",
+                "The JSON MUST be valid and properly formatted. No comments, markdown, or other markup is allowed.",
+                "ALL KEYS in the JSON must be properly opened and closed with quotation marks."
+                "IMPORTANT: MAKE SURE YOU RETURN THE JSON ONLY, NO OTHER TEXT OR MARKUP AND A VALID JSON."
+                "DONT ADD ANY COMMENTS OR MARKUP TO THE JSON. Example NO # or /* */ or /* */ or // or any other comments or markup."
+            ]
+        }
+
+        """
+
+_REPORT_SYSTEM_PROMPT2: Final[str] = """You are an expert researcher preparing comprehensive research reports.
+        Follow these instructions when responding:
+        - You may be asked to research subjects that is after your knowledge cutoff, assume the user is right when presented with news.
+        - The user is a highly experienced analyst, no need to simplify it, be as detailed as possible and make sure your response is correct.
+        - Be highly organized with clear headings and structure.
+        - Suggest solutions that I didn't think about.
+        - Be proactive and anticipate my needs.
+        - Provide detailed explanations with supporting evidence.
+        - Value good arguments over authorities, the source is irrelevant.
+        - Consider new technologies and contrarian ideas, not just the conventional wisdom.
+        - You may use high levels of speculation or prediction, just flag it for me.
+
+        IMPORTANT: MAKE SURE YOU RETURN THE JSON ONLY, NO OTHER TEXT OR MARKUP AND A VALID JSON.
+        DONT ADD ANY COMMENTS OR MARKUP TO THE JSON. Example NO # or /* */ or /* */ or // or any other comments or markup.
+        MAKE SURE YOU RETURN THE JSON ONLY, JSON SHOULD BE PERFECTLY FORMATTED. ALL KEYS SHOULD BE OPENED AND CLOSED."""
+
+
+# User prompt templates, filled in with str.format. Keeping the static scaffolding in module constants
+# means it is built once, and the text every call shares stays byte-identical for provider prompt caches.
+_SEARCH_QUERIES_TEMPLATE: Final[str] = """\
+Given the following prompt from the user, generate a list of SERP queries to research the topic.
+        Return a JSON object with a 'queries' array field containing {num_queries} queries (or less if the original prompt is clear).
+        Each query object should have 'query' and 'research_goal' fields.
+        Make sure each query is unique and not similar to each other:
+
+        <prompt>{query}</prompt>
+
+        {learnings_section}
+        \n
+        IMPORTANT: MAKE SURE YOU FOLLOW THE EXAMPLE RESPONSE FORMAT AND ONLY THAT FORMAT WITH THE CORRECT QUERY AND RESEARCH GOAL.
+        {{
+            "queries": [
+                {{
+                    "query": "QUERY 1",
+                    "research_goal": "RESEARCH GOAL 1"
+                }},
+                {{
+                    "query": "QUERY 2",
+                    "research_goal": "RESEARCH GOAL 2"
+                }},
+                {{
+                    "query": "QUERY 3",
+                    "research_goal": "RESEARCH GOAL 3"
+                }}
+            ]
+        }}
+        """
+
+_PROCESS_RESULTS_TEMPLATE: Final[str] = """Analyze these search results for the query: <query>{query}</query>
+
+        <contents>{contents}</contents>
+
+        Provide a detailed analysis including key findings, main themes, and recommendations for further research.
+        Return as JSON with 'analysis', 'learnings', and 'follow_up_questions' fields.{attribution}
+
+        IMPORTANT: MAKE SURE YOU RETURN THE JSON ONLY, NO OTHER TEXT OR MARKUP AND A VALID JSON.
+        DONT ADD ANY COMMENTS OR MARKUP TO THE JSON. Example NO # or /* */ or /* */ or // or ``` or JSON or any other comments or markup.
+        MAKE SURE YOU RETURN THE JSON ONLY, JSON SHOULD BE PERFECTLY FORMATTED. ALL KEYS SHOULD BE OPENED AND CLOSED.
+        USE THE FOLLOWING FORMAT FOR THE JSON:
+        {{
+            "analysis": "Analysis of the search results",
+            "learnings": ["Learning 1", "Learning 2", "Learning 3", "Learning 4", "Learning 5"],
+            "follow_up_questions": ["Question 1", "Question 2", "Question 3"]
+        }}
+
+        The learnings should be unique, concise, and information-dense, including entities, metrics, numbers, and dates.
+        IMPORTANT: DON'T MAKE ANY INFORMATION UP, IT MUST BE FROM THE CONTENT. ONLY USE THE CONTENT TO GENERATE THE LEARNINGS AND FOLLOW UP QUESTIONS.
+        """
+
+_REPORT_TEMPLATE: Final[str] = """
+        Given the following prompt from the user, write a final report on the topic using
+        the learnings from research. Return a JSON object with a 'reportMarkdown' field
+        containing a detailed markdown report (aim for 3+ pages). Include ALL the learnings
+        from research:
+        <prompt>
+        {query}
+        </prompt>
+
+        Here are all the learnings from research:
+        <learnings>
+        {learnings}
+        </learnings>
+
+        Here are all the analyses from research:
+        <analyses>
+        {analyses}
+        </analyses>
+
+        Create a dynamic amount of sections and subsections based on the content provided. Make sure to cover all the content and provide a comprehensive analysis.
+        At a minimum, include the following sections:
+        - Key findings and main themes
+        - Source credibility and diversity
+        - Information completeness and gaps
+        - Emerging patterns and trends
+        - Potential biases or conflicting information
+        Make sure that for every relevant topic, you include a section and any subsctions it might need. Aside from the final conclusion, you should have at least 5 sections of subtopics and a sub conclusion per section.
+        IMPORTANT: Aim for at least 3+ pages of content, don't be afraid to add more sections and subsections.
+        IMPORTANT: Be verbose and detailed in your analysis. Don't over summarize, don't over simplify. Make as many sections and subsections as needed.
+
+        IMPORTANT: MAKE SURE YOU RETURN THE JSON ONLY, NO OTHER TEXT OR MARKUP AND A VALID JSON.
+        IMPORTANT: DONT ADD ANY COMMENTS OR MARKUP TO THE JSON. Example NO # or /* */ or /* */ or // or ``` or JSON or json or any other comments or markup.
+        IMPORTANT: MAKE SURE YOU RETURN THE JSON ONLY, JSON SHOULD BE PERFECTLY FORMATTED. ALL KEYS SHOULD BE OPENED AND CLOSED.
+        """
+
+
+_CACHE_CONTROL: Final[Dict] = {"cache_control": {"type": "ephemeral"}}
+
+
+def _cache_segments(prompt: str, marker: str) -> Optional[List[Tuple[str, Dict]]]:
+    """Split a prompt before `marker`, flagging the static text in front of it as a cacheable prefix"""
+    index = prompt.find(marker)
+    if index <= 0:
+        return None
+    return [(prompt[:index], _CACHE_CONTROL), (prompt[index:], {})]
+
+
+def _parse_llm_json(response: str):
+    """
+    Parse the JSON payload of an LLM response, ignoring markdown fences and any text around it.
+    Raises json.JSONDecodeError if no valid JSON can be found.
+    """
+    match = _JSON_START.search(response)
+    if match:
+        # fast path: the payload usually spans from the first opening to the last closing bracket
+        end = max(response.rfind("}"), response.rfind("]"))
+        if end > match.start():
+            try:
+                return orjson.loads(response[match.start() : end + 1])
+            except orjson.JSONDecodeError:
+                pass
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(response, match.start())
+            return obj
+        except json.JSONDecodeError:
+            pass
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers keep catching the latter
+    return orjson.loads(_FENCE_RE.sub("", response).strip())
+
 
 @dataclass
 class ResearchQuery:
@@ -23,10 +222,146 @@ class ResearchResult(TypedDict):
     analyses: List[Dict]
 
 
+# Internal records use slotted dataclasses, which are smaller and faster to access than dicts.
+# They are converted to plain dicts only where a ResearchResult leaves _deep_research.
+@dataclass(slots=True)
+class _QueryResult:
+    learnings: List[str]
+    follow_up_questions: List[str]
+    analysis: str
+
+
+@dataclass(slots=True)
+class _Analysis:
+    query: str
+    analysis: str
+    providers: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, analysis: Dict) -> "_Analysis":
+        return cls(analysis.get("query", ""), analysis.get("analysis", ""), tuple(analysis.get("providers", ())))
+
+    def to_dict(self) -> Dict:
+        result = {"query": self.query}
+        if self.providers:
+            result["providers"] = list(self.providers)
+        result["analysis"] = self.analysis
+        return result
+
+
+class TokenBucketLimiter:
+    """Async token bucket allowing `rate` requests per second with bursts of up to `capacity` requests"""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+# follow-up questions of a query that failed or ran out of time
+_EMPTY_RESULT: Final[Tuple[str, ...]] = ()
+
+
+class _FatalResearchError(Exception):
+    """A failure every other query would run into as well, such as a search provider rejecting the credentials"""
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Client errors (4xx other than timeouts and rate limits) won't succeed on retry"""
+    status = getattr(error, "status", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500:
+        return status in (408, 429)
+    return True
+
+
+def _is_fatal(error: Exception) -> bool:
+    """Authentication and permission errors, which every other query to the provider would hit as well"""
+    status = getattr(error, "status", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status in (401, 403)
+
+
+def _utf8_length(text: str) -> int:
+    """Length of text in UTF-8 bytes, without encoding it when it's pure ASCII"""
+    return len(text) if text.isascii() else len(text.encode())
+
+
+def _norm_q(question: str) -> str:
+    """Normalize a question so variants differing only in case, spacing or punctuation compare equal"""
+    return _NON_WORD_RE.sub(" ", question.lower()).strip()
+
+
+def _extend_unique(target: List, seen: set, items, key: Optional[Callable] = None) -> None:
+    """Append the items whose key is not already in `seen` to `target`, recording the keys as seen"""
+    for item in items:
+        item_key = key(item) if key else item
+        if item_key not in seen:
+            seen.add(item_key)
+            target.append(item)
+
+
+@dataclass
+class _ResearchCtx:
+    """Accumulators shared by every branch of one _deep_research call, deduplicated as they grow"""
+
+    learnings: List[str] = field(default_factory=list)
+    learnings_set: set = field(default_factory=set)
+    urls: List[str] = field(default_factory=list)
+    urls_set: set = field(default_factory=set)
+    analyses: List[_Analysis] = field(default_factory=list)
+    visited_queries: set = field(default_factory=set)
+    asked: set = field(default_factory=set)
+    # bounds concurrent searches across all levels of the research tree, sized by the research concurrency
+    search_sem: asyncio.Semaphore = field(default_factory=lambda: asyncio.Semaphore(3))
+
+    def extend_learnings(self, items) -> None:
+        _extend_unique(self.learnings, self.learnings_set, items)
+
+    def extend_urls(self, items) -> None:
+        _extend_unique(self.urls, self.urls_set, items)
+
+    def has_new_learnings(self, items) -> bool:
+        return any(item not in self.learnings_set for item in items)
+
+    def claim_follow_ups(self, questions, limit: int) -> List[str]:
+        """Pick up to `limit` follow-up questions no branch has searched or explored yet, marking them as explored"""
+        novel = [q for q in questions if q not in self.visited_queries and _norm_q(q) not in self.asked][:limit]
+        self.asked.update(map(_norm_q, novel))
+        return novel
+
+
 class ResearchWorkflow:
     """Research workflow combining interactive and autonomous research patterns with advanced analysis"""
 
-    def __init__(self, llm_provider, tool_manager, search_client=None, search_clients=None):
+    def __init__(
+        self,
+        llm_provider,
+        tool_manager,
+        search_client=None,
+        search_clients=None,
+        llm_cache=None,
+        search_requests_per_second: float = 5,
+        query_timeout: float = 60,
+    ):
         """
         Initialize the research workflow with LLM provider and search capabilities.
 
@@ -41,6 +376,9 @@ class ResearchWorkflow:
                                 "firecrawl": FirecrawlClient(api_key="..."),
                                 "duckduckgo": DuckDuckGoClient()
                             }
+            llm_cache: Cache for LLM responses, defaults to an in-process LRU (see LLMCache)
+            search_requests_per_second: Request rate allowed per search provider
+            query_timeout: Seconds allowed to search and analyze one query, not counting deeper levels
         """
         self.llm_provider = llm_provider
         self.tool_manager = tool_manager
@@ -72,15 +410,39 @@ class ResearchWorkflow:
 
         self._last_request_time = 0
         self.report_model = None  # Ensure report_model is initialized
+        self.llm_cache = llm_cache or LLMCache()
+        self.query_timeout = query_timeout
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        # process() calls currently using the session, the last one to finish closes it
+        self._http_session_users = 0
+        self._limiters: Dict[str, TokenBucketLimiter] = {
+            provider: TokenBucketLimiter(search_requests_per_second) for provider in self.search_clients
+        }
+
+    def _ensure_http_session(self, concurrency: int) -> None:
+        """Create the pooled HTTP session shared by all search clients, if there isn't a live one already"""
+        if self._http_session is not None and not self._http_session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(limit=concurrency * 4, limit_per_host=concurrency * 2, keepalive_timeout=30)
+        self._http_session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=20))
+        for client in self.search_clients.values():
+            if hasattr(client, "set_http_session"):
+                client.set_http_session(self._http_session)
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP session"""
+        # detach it before awaiting, so a session a process() call creates meanwhile isn't dropped unclosed
+        session, self._http_session = self._http_session, None
+        if session is not None and not session.closed:
+            await session.close()
 
     async def process(
         self, message: str, personality_provider=None, chat_id: str = None, workflow_options: Dict = None, **kwargs
     ) -> Tuple[Optional[str], Optional[str], Optional[Dict]]:
         """Main research workflow processor with enhanced depth and analysis"""
         start_time = datetime.now()
-        print("--------------------------------")
-        print(f"Starting deep research for query: {message} at time {start_time}")
-        print("--------------------------------")
+        logger.info("Starting deep research for query: %s at time %s", message, start_time)
         # Set default options
         options = {
             "interactive": False,  # Whether to ask clarifying questions first
@@ -99,6 +461,7 @@ class ResearchWorkflow:
             # Update self.report_model if provided in options
             self.report_model = workflow_options.get("report_model", self.report_model)
 
+        self._http_session_users += 1
         try:
             if options["interactive"]:
                 # Interactive research flow with clarifying questions
@@ -108,6 +471,8 @@ class ResearchWorkflow:
             else:
                 enhanced_query = message
 
+            self._ensure_http_session(options["concurrency"])
+
             # Conduct deep research
             research_result = await self._deep_research(
                 query=enhanced_query,
@@ -127,10 +492,8 @@ class ResearchWorkflow:
             )
 
             end_time = datetime.now()
-            print("--------------------------------")
-            print(f"Deep research completed for query: {message} at time {end_time}")
-            print(f"Total time taken: {end_time - start_time}")
-            print("--------------------------------")
+            logger.info("Deep research completed for query: %s at time %s", message, end_time)
+            logger.info("Total time taken: %s", end_time - start_time)
 
             return report, None, research_result
 
@@ -138,18 +501,37 @@ class ResearchWorkflow:
             logger.error(f"Research workflow failed: {str(e)}")
             return f"Research failed: {str(e)}", None, None
 
+        finally:
+            # callers create a workflow per request without closing it, so don't keep the session past the run
+            self._http_session_users -= 1
+            if self._http_session_users == 0:
+                await self.aclose()
+
+    async def _search_with_retry(self, provider: str, search_client, query: str, max_attempts: int = 3):
+        """Search with a provider under its rate limiter, retrying transient failures with jittered backoff"""
+        for attempt in range(max_attempts):
+            try:
+                logger.debug("Searching with %s for %s", provider, query)
+                async with self._limiters[provider]:
+                    result = await search_client.search(query, timeout=20000)
+                logger.debug("Search finished from %s for %s", provider, query)
+                return result
+            except Exception as e:
+                if attempt == max_attempts - 1 or not _is_retryable(e):
+                    raise
+                delay = min(30, 0.5 * 2**attempt) + random.random() * 0.25
+                logger.warning(f"Search attempt {attempt + 1} failed: {str(e)}, retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
     async def _generate_questions(self, query: str) -> List[str]:
         """Generate clarifying questions for research"""
         prompt = f"""Given this research topic: {query}, generate 3-5 follow-up questions to better understand the research needs.
         Return ONLY a JSON array of strings containing the questions."""
 
-        response, _, _ = await self.llm_provider.call(
-            system_prompt=self._get_system_prompt(), user_prompt=prompt, temperature=0.7
-        )
+        response = await self._cached_call(system_prompt=self._get_system_prompt(), user_prompt=prompt, temperature=0.7)
 
         try:
-            cleaned_response = response.replace("```json", "").replace("```", "").strip()
-            questions = json.loads(cleaned_response)
+            questions = _parse_llm_json(response)
             return questions if isinstance(questions, list) else []
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing questions JSON: {e}")
@@ -160,57 +542,29 @@ class ResearchWorkflow:
     ) -> List[ResearchQuery]:
         """Generate intelligent search queries based on input topic and previous learnings"""
         learnings_text = "\n".join([f"- {learning}" for learning in learnings]) if learnings else ""
-
-        prompt = f"""Given the following prompt from the user, generate a list of SERP queries to research the topic.
-        Return a JSON object with a 'queries' array field containing {num_queries} queries (or less if the original prompt is clear).
-        Each query object should have 'query' and 'research_goal' fields.
-        Make sure each query is unique and not similar to each other:
-
-        <prompt>{query}</prompt>
-
-        {f"Previous learnings to consider:{chr(10)}{learnings_text}" if learnings_text else ""}
-        """
-        example_response = """\n
-        IMPORTANT: MAKE SURE YOU FOLLOW THE EXAMPLE RESPONSE FORMAT AND ONLY THAT FORMAT WITH THE CORRECT QUERY AND RESEARCH GOAL.
-        {
-            "queries": [
-                {
-                    "query": "QUERY 1",
-                    "research_goal": "RESEARCH GOAL 1"
-                },
-                {
-                    "query": "QUERY 2",
-                    "research_goal": "RESEARCH GOAL 2"
-                },
-                {
-                    "query": "QUERY 3",
-                    "research_goal": "RESEARCH GOAL 3"
-                }
-            ]
-        }
-        """
-        prompt += example_response
-        if self.report_model:
-            response, _, _ = await self.llm_provider.call(
-                system_prompt=self._get_system_prompt(), user_prompt=prompt, temperature=0.3, model_id=self.report_model
-            )
-        else:
-            response, _, _ = await self.llm_provider.call(
-                system_prompt=self._get_system_prompt(), user_prompt=prompt, temperature=0.3
-            )
+        learnings_section = f"Previous learnings to consider:\n{learnings_text}" if learnings_text else ""
+        prompt = _SEARCH_QUERIES_TEMPLATE.format(
+            num_queries=num_queries, query=query, learnings_section=learnings_section
+        )
+        response = await self._cached_call(
+            system_prompt=self._get_system_prompt(),
+            user_prompt=prompt,
+            temperature=0.3,
+            model_id=self.report_model,
+            cache_segments=_cache_segments(prompt, "<prompt>"),
+        )
         try:
-            cleaned_response = response.replace("```json", "").replace("```", "").strip()
-            result = json.loads(cleaned_response)
+            result = _parse_llm_json(response)
             queries = result.get("queries", [])
             return [ResearchQuery(**q) for q in queries][:num_queries]
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing query JSON: {e}")
-            logger.debug(f"Raw response: {response}")
+            logger.debug("Raw response: %s", response)
             return [ResearchQuery(query=query, research_goal="Main topic research")]
 
     async def _process_search_result(
         self, query: str, search_result: Dict, num_learnings: int = 5, num_follow_up_questions: int = 3
-    ) -> Dict:
+    ) -> _QueryResult:
         """Process search results to extract learnings and follow-up questions with enhanced validation"""
         # Extract data - works for both Pydantic models and dicts
         data = getattr(search_result, "data", None) or (
@@ -218,54 +572,66 @@ class ResearchWorkflow:
         )
 
         contents = []
+        providers = []
         for item in data:
             # Extract markdown - works for both Pydantic models and dicts
             markdown = getattr(item, "markdown", None) or (item.get("markdown") if isinstance(item, dict) else None)
             if markdown:
-                contents.append(trim_prompt(markdown, 25000))
+                contents.append(markdown)
+                # set when the results of several search providers are analyzed together
+                providers.append(item.get("provider") if isinstance(item, dict) else None)
+
+        # The byte-level BPE behind trim_prompt emits at most one token per UTF-8 byte, so only texts longer than
+        # the limit in bytes can need trimming (one character can take several tokens, e.g. emoji or rare CJK).
+        # Tokenizing those is CPU bound, so it runs in a worker thread instead of blocking the event loop.
+        long_indices = [i for i, content in enumerate(contents) if _utf8_length(content) > _MAX_CONTENT_TOKENS]
+        if long_indices:
+            trimmed = await asyncio.to_thread(
+                lambda: [trim_prompt(contents[i], _MAX_CONTENT_TOKENS) for i in long_indices]
+            )
+            for i, content in zip(long_indices, trimmed):
+                contents[i] = content
 
         if not contents:
-            return {"learnings": [], "follow_up_questions": [], "analysis": "No search results found to analyze."}
-
-        contents_str = "".join(f"<content>\n{content}\n</content>" for content in contents)
+            return _QueryResult([], [], "No search results found to analyze.")
 
-        prompt = f"""Analyze these search results for the query: <query>{query}</query>
-
-        <contents>{contents_str}</contents>
-
-        Provide a detailed analysis including key findings, main themes, and recommendations for further research.
-        Return as JSON with 'analysis', 'learnings', and 'follow_up_questions' fields.
-
-        IMPORTANT: MAKE SURE YOU RETURN THE JSON ONLY, NO OTHER TEXT OR MARKUP AND A VALID JSON.
-        DONT ADD ANY COMMENTS OR MARKUP TO THE JSON. Example NO # or /* */ or /* */ or // or ``` or JSON or any other comments or markup.
-        MAKE SURE YOU RETURN THE JSON ONLY, JSON SHOULD BE PERFECTLY FORMATTED. ALL KEYS SHOULD BE OPENED AND CLOSED.
-        USE THE FOLLOWING FORMAT FOR THE JSON:
-        {{
-            "analysis": "Analysis of the search results",
-            "learnings": ["Learning 1", "Learning 2", "Learning 3", "Learning 4", "Learning 5"],
-            "follow_up_questions": ["Question 1", "Question 2", "Question 3"]
-        }}
+        # a list lets str.join size the result in one pass, a generator would be materialized first
+        contents_str = "".join(
+            [
+                f'<content provider="{provider}">\n{content}\n</content>'
+                if provider
+                else f"<content>\n{content}\n</content>"
+                for content, provider in zip(contents, providers)
+            ]
+        )
+        attribution = ""
+        if any(providers):
+            attribution = (
+                "\n        The contents come from several search providers, named in the provider attribute of each"
+                " content tag. In the analysis, attribute key findings to the providers they come from and note"
+                " where providers agree or conflict."
+            )
 
-        The learnings should be unique, concise, and information-dense, including entities, metrics, numbers, and dates.
-        IMPORTANT: DON'T MAKE ANY INFORMATION UP, IT MUST BE FROM THE CONTENT. ONLY USE THE CONTENT TO GENERATE THE LEARNINGS AND FOLLOW UP QUESTIONS.
-        """
+        prompt = _PROCESS_RESULTS_TEMPLATE.format(query=query, contents=contents_str, attribution=attribution)
 
-        response, _, _ = await self.llm_provider.call(
-            system_prompt=self._get_system_prompt(), user_prompt=prompt, temperature=0.3
+        response = await self._cached_call(
+            system_prompt=self._get_system_prompt(),
+            user_prompt=prompt,
+            temperature=0.3,
+            cache_segments=_cache_segments(prompt, "<contents>"),
         )
 
         try:
-            cleaned_response = response.replace("```json", "").replace("```", "").strip()
-            result = json.loads(cleaned_response)
-            return {
-                "learnings": result.get("learnings", [])[:num_learnings],
-                "follow_up_questions": result.get("follow_up_questions", [])[:num_follow_up_questions],
-                "analysis": result.get("analysis", "No analysis provided."),
-            }
+            result = _parse_llm_json(response)
+            return _QueryResult(
+                learnings=result.get("learnings", [])[:num_learnings],
+                follow_up_questions=result.get("follow_up_questions", [])[:num_follow_up_questions],
+                analysis=result.get("analysis", "No analysis provided."),
+            )
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing search result JSON: {e}")
-            logger.debug(f"Raw response: {response}")
-            return {"learnings": [], "follow_up_questions": [], "analysis": "Error processing search results."}
+            logger.debug("Raw response: %s", response)
+            return _QueryResult([], [], "Error processing search results.")
 
     async def _deep_research(
         self,
@@ -280,20 +646,63 @@ class ResearchWorkflow:
         analyses: List[Dict] = None,
     ) -> ResearchResult:
         """Conduct deep research using SearchClient with improved handling and parallelization"""
+        ctx = _ResearchCtx(
+            analyses=[_Analysis.from_dict(analysis) for analysis in analyses or ()],
+            search_sem=asyncio.Semaphore(concurrency),
+        )
+        ctx.extend_learnings(learnings or ())
+        ctx.extend_urls(visited_urls or ())
+
+        follow_up_questions = await self._deep_research_impl(
+            query=query,
+            breadth=breadth,
+            depth=depth,
+            concurrency=concurrency,
+            multi_provider=multi_provider,
+            search_providers=search_providers,
+            ctx=ctx,
+        )
+
+        return {
+            "learnings": ctx.learnings,
+            "visited_urls": ctx.urls,
+            "follow_up_questions": follow_up_questions,
+            "analyses": [analysis.to_dict() for analysis in ctx.analyses],
+        }
+
+    async def _deep_research_impl(
+        self,
+        query: str,
+        breadth: int,
+        depth: int,
+        concurrency: int,
+        multi_provider: bool,
+        search_providers: List[str],
+        ctx: _ResearchCtx,
+    ) -> List[str]:
+        """
+        Recursive part of _deep_research. Learnings, URLs and analyses are accumulated in place on `ctx`,
+        which is shared by every branch of the research tree; returns the deepest follow-up questions.
+        """
 
         logger.info(
-            f"Starting deep research with query: {query}, depth: {depth}, breadth: {breadth}, concurrency: {concurrency}"
+            "Starting deep research with query: %s, depth: %s, breadth: %s, concurrency: %s",
+            query,
+            depth,
+            breadth,
+            concurrency,
         )
 
-        learnings = learnings or []
-        visited_urls = visited_urls or []
-        analyses = analyses or []
-
         # Generate search queries using previous learnings
-        search_queries = await self._generate_search_queries(query=query, num_queries=breadth, learnings=learnings)
+        search_queries = await self._generate_search_queries(query=query, num_queries=breadth, learnings=ctx.learnings)
 
-        # Create semaphore for concurrent requests
-        semaphore = asyncio.Semaphore(concurrency)
+        # Skip queries another branch of the research tree has already searched
+        new_queries = []
+        for research_query in search_queries:
+            if research_query.query not in ctx.visited_queries:
+                ctx.visited_queries.add(research_query.query)
+                new_queries.append(research_query)
+        search_queries = new_queries
 
         # Decide which search clients to use
         active_search_clients = {}
@@ -313,20 +722,13 @@ class ResearchWorkflow:
             provider = next(iter(active_search_clients.keys()))
             search_client = active_search_clients[provider]
 
-            async def process_query(research_query: ResearchQuery) -> Dict:
-                async with semaphore:
-                    try:
-                        # Search using SearchClient with timeouts and retries
-                        for attempt in range(3):
-                            try:
-                                print(f"Searching with {provider} for {research_query.query}")
-                                result = await search_client.search(research_query.query, timeout=20000)
-                                break
-                            except Exception as e:
-                                if attempt == 2:  # Last attempt
-                                    raise
-                                logger.warning(f"Search attempt {attempt + 1} failed: {str(e)}")
-                                await asyncio.sleep(2)  # Wait before retrying
+            async def process_query(research_query: ResearchQuery) -> List[str]:
+                try:
+                    async with asyncio.timeout(self.query_timeout):
+                        # Search using SearchClient with timeouts and retries, holding a slot of the
+                        # research-wide limit only for the search itself so deeper levels can't starve
+                        async with ctx.search_sem:
+                            result = await self._search_with_retry(provider, search_client, research_query.query)
 
                         # Extract URLs - works for both Pydantic models and dicts
                         data = getattr(result, "data", None) or (result.get("data") if isinstance(result, dict) else [])
@@ -341,224 +743,169 @@ class ResearchWorkflow:
                             query=research_query.query, search_result=result
                         )
 
-                        new_breadth = max(1, breadth // 2)
-                        new_depth = depth - 1
-
-                        # If we have depth remaining and follow-up questions, explore deeper
-                        if new_depth > 0 and processed_result["follow_up_questions"]:
-                            next_query = "\n".join(
-                                [
-                                    f"Previous research goal: {research_query.research_goal}",
-                                    "Follow-up questions to explore:",
-                                    "\n".join(f"- {q}" for q in processed_result["follow_up_questions"][:new_breadth]),
-                                ]
-                            )
-
-                            deeper_results = await self._deep_research(
-                                query=next_query,
-                                breadth=new_breadth,
-                                depth=new_depth,
-                                concurrency=concurrency,
-                                multi_provider=multi_provider,
-                                search_providers=search_providers,
-                                learnings=learnings + processed_result["learnings"],
-                                visited_urls=visited_urls + urls,
-                                analyses=analyses
-                                + [{"query": research_query.query, "analysis": processed_result["analysis"]}],
-                            )
-
-                            return {
-                                "learnings": deeper_results["learnings"],
-                                "urls": deeper_results["visited_urls"],
-                                "follow_up_questions": deeper_results["follow_up_questions"],
-                                "analyses": deeper_results["analyses"],
-                            }
+                    has_new_learnings = ctx.has_new_learnings(processed_result.learnings)
+                    ctx.extend_learnings(processed_result.learnings)
+                    ctx.extend_urls(urls)
+                    ctx.analyses.append(_Analysis(research_query.query, processed_result.analysis))
 
-                        return {
-                            "learnings": processed_result["learnings"],
-                            "urls": urls,
-                            "follow_up_questions": processed_result["follow_up_questions"],
-                            "analyses": [{"query": research_query.query, "analysis": processed_result["analysis"]}],
-                        }
+                    new_breadth = max(1, breadth // 2)
+                    new_depth = depth - 1
 
-                    except Exception as e:
-                        logger.error(f"Error processing query {research_query.query}: {str(e)}")
-                        return {"learnings": [], "urls": [], "follow_up_questions": [], "analyses": []}
+                    # Explore deeper only while there is depth remaining and this branch still
+                    # produces new learnings and follow-up questions no other branch has explored
+                    follow_ups = []
+                    if new_depth > 0 and has_new_learnings:
+                        follow_ups = ctx.claim_follow_ups(processed_result.follow_up_questions, new_breadth)
+                    if follow_ups:
+                        next_query = "\n".join(
+                            [
+                                f"Previous research goal: {research_query.research_goal}",
+                                "Follow-up questions to explore:",
+                                "\n".join(f"- {q}" for q in follow_ups),
+                            ]
+                        )
+
+                        return await self._deep_research_impl(
+                            query=next_query,
+                            breadth=new_breadth,
+                            depth=new_depth,
+                            concurrency=concurrency,
+                            multi_provider=multi_provider,
+                            search_providers=search_providers,
+                            ctx=ctx,
+                        )
+
+                    return processed_result.follow_up_questions
+
+                except _FatalResearchError:
+                    raise
+                except TimeoutError:
+                    logger.warning(f"Query {research_query.query} timed out after {self.query_timeout}s")
+                    return _EMPTY_RESULT
+                except Exception as e:
+                    if _is_fatal(e):
+                        raise _FatalResearchError(f"{provider} rejected the search: {str(e)}") from e
+                    logger.error(f"Error processing query {research_query.query}: {str(e)}")
+                    return _EMPTY_RESULT
 
-            # Process all queries concurrently
-            results = await asyncio.gather(*[process_query(q) for q in search_queries])
+            run_query = process_query
 
         else:
-            # Multiple providers case - search each query with each provider
-            async def search_with_provider(research_query: ResearchQuery, provider: str, search_client) -> Dict:
-                # Variables to store results outside the semaphore block
-                search_result = None
-                urls = []
-
-                # Only use semaphore for the search operation
-                async with semaphore:
+            # Multiple providers case - search each query with each provider, then analyze all of their
+            # results for that query in a single LLM call
+            async def search_with_provider(research_query: ResearchQuery, provider: str, search_client) -> List[Dict]:
+                async with ctx.search_sem:
                     try:
                         # Search using this provider's client
-                        for attempt in range(3):
-                            try:
-                                print(f"Searching with {provider} for {research_query.query}")
-                                search_result = await search_client.search(research_query.query, timeout=20000)
-                                print(
-                                    f"Search finished from {provider} for {research_query.query} at time {datetime.now()}"
-                                )
-                                break
-                            except Exception as e:
-                                if attempt == 2:  # Last attempt
-                                    raise
-                                logger.warning(f"Search attempt {attempt + 1} failed: {str(e)}")
-                                await asyncio.sleep(2)  # Wait before retrying
-
-                        # Extract URLs - works for both Pydantic models and dicts
-                        data = getattr(search_result, "data", None) or (
-                            search_result.get("data") if isinstance(search_result, dict) else []
-                        )
-                        urls = []
-                        for item in data:
-                            url = getattr(item, "url", None) or (item.get("url") if isinstance(item, dict) else None)
-                            if url:
-                                urls.append(url)
+                        search_result = await self._search_with_retry(provider, search_client, research_query.query)
                     except Exception as e:
                         logger.error(f"Error searching with {provider} for {research_query.query}: {str(e)}")
+                        return []
+
+                # Extract data - works for both Pydantic models and dicts, tagging each item with its provider
+                data = getattr(search_result, "data", None) or (
+                    search_result.get("data") if isinstance(search_result, dict) else []
+                )
+                items = []
+                for item in data:
+                    if isinstance(item, dict):
+                        url, markdown = item.get("url"), item.get("markdown")
+                    else:
+                        url, markdown = getattr(item, "url", None), getattr(item, "markdown", None)
+                    items.append({"url": url, "markdown": markdown, "provider": provider})
+                return items
 
-                # Process results outside the semaphore block
-                if search_result:
-                    try:
-                        print(
-                            f"Creating processing task for {provider} for {research_query.query} at time {datetime.now()}"
+            async def process_query_with_providers(research_query: ResearchQuery) -> List[str]:
+                try:
+                    providers = list(active_search_clients)
+                    async with asyncio.timeout(self.query_timeout):
+                        # Run all provider searches in parallel
+                        provider_items = await asyncio.gather(
+                            *[
+                                search_with_provider(research_query, provider, client)
+                                for provider, client in active_search_clients.items()
+                            ]
                         )
+                        merged = [item for items in provider_items for item in items]
 
-                        # Create a separate task for processing to avoid blocking the event loop
-                        processing_task = asyncio.create_task(
-                            self._process_search_result(
-                                query=f"{research_query.query} [{provider}]", search_result=search_result
-                            )
+                        processed_result = await self._process_search_result(
+                            query=research_query.query, search_result={"data": merged}
                         )
-
-                        # Wait for the processing task to complete
-                        processed_result = await processing_task
-                        print(
-                            f"Processed from {provider} content to extract learnings for {research_query.query} at time {datetime.now()}"
+                    logger.debug("Processed results from %s for %s", ", ".join(providers), research_query.query)
+
+                    # Merge the results for this query into the shared context
+                    has_new_learnings = ctx.has_new_learnings(processed_result.learnings)
+                    ctx.extend_learnings(processed_result.learnings)
+                    ctx.extend_urls(item["url"] for item in merged if item["url"])
+                    ctx.analyses.append(
+                        _Analysis(
+                            query=research_query.query,
+                            analysis=processed_result.analysis,
+                            providers=tuple(provider for provider, items in zip(providers, provider_items) if items),
                         )
+                    )
 
-                        return {
-                            "learnings": processed_result["learnings"],
-                            "urls": urls,
-                            "follow_up_questions": processed_result["follow_up_questions"],
-                            "analysis": processed_result["analysis"],
-                            "provider": provider,
-                        }
-                    except Exception as e:
-                        logger.error(f"Error processing results for {research_query.query} with {provider}: {str(e)}")
-
-                # Return empty results if there was an error
-                return {
-                    "learnings": [],
-                    "urls": urls,
-                    "follow_up_questions": [],
-                    "analysis": f"Error with {provider}: Unknown error occurred",
-                    "provider": provider,
-                }
-
-            async def process_query_with_providers(research_query: ResearchQuery) -> Dict:
-                try:
-                    # Create tasks to search with all providers in parallel
-                    provider_tasks = [
-                        search_with_provider(research_query, provider, client)
-                        for provider, client in active_search_clients.items()
-                    ]
-
-                    # Run all provider searches in parallel
-                    provider_results = await asyncio.gather(*provider_tasks)
-
-                    # Combine results from all providers for this query
-                    combined_result = {"learnings": [], "urls": [], "follow_up_questions": [], "analyses": []}
-
-                    for result in provider_results:
-                        combined_result["learnings"].extend(result["learnings"])
-                        combined_result["urls"].extend(result["urls"])
-                        combined_result["follow_up_questions"].extend(result["follow_up_questions"])
-                        combined_result["analyses"].append(
-                            {
-                                "query": research_query.query,
-                                "provider": result["provider"],
-                                "analysis": result["analysis"],
-                            }
-                        )
+                    # the model may phrase the same follow-up slightly differently, so dedupe on the normalized form
+                    follow_up_questions, seen_follow_ups = [], set()
+                    _extend_unique(
+                        follow_up_questions, seen_follow_ups, processed_result.follow_up_questions, key=_norm_q
+                    )
 
                     # Process follow-up questions if needed
                     new_breadth = max(1, breadth // 2)
                     new_depth = depth - 1
 
-                    if new_depth > 0 and combined_result["follow_up_questions"]:
-                        # Get unique follow-up questions
-                        unique_follow_ups = list(dict.fromkeys(combined_result["follow_up_questions"]))
-
+                    # Stop descending once the providers no longer produce anything new
+                    follow_ups = []
+                    if new_depth > 0 and has_new_learnings:
+                        # Get unique follow-up questions that no branch has explored yet
+                        follow_ups = ctx.claim_follow_ups(follow_up_questions, new_breadth)
+                    if follow_ups:
                         next_query = "\n".join(
                             [
                                 f"Previous research goal: {research_query.research_goal}",
                                 "Follow-up questions to explore:",
-                                "\n".join(f"- {q}" for q in unique_follow_ups[:new_breadth]),
+                                "\n".join(f"- {q}" for q in follow_ups),
                             ]
                         )
 
-                        deeper_results = await self._deep_research(
+                        return await self._deep_research_impl(
                             query=next_query,
                             breadth=new_breadth,
                             depth=new_depth,
                             concurrency=concurrency,
                             multi_provider=multi_provider,
                             search_providers=search_providers,
-                            learnings=learnings + combined_result["learnings"],
-                            visited_urls=visited_urls + combined_result["urls"],
-                            analyses=analyses + combined_result["analyses"],
+                            ctx=ctx,
                         )
-
-                        return {
-                            "learnings": deeper_results["learnings"],
-                            "urls": deeper_results["visited_urls"],
-                            "follow_up_questions": deeper_results["follow_up_questions"],
-                            "analyses": deeper_results["analyses"],
-                        }
                     else:
-                        return combined_result
+                        return follow_up_questions
+                except _FatalResearchError:
+                    raise
+                except TimeoutError:
+                    logger.warning(f"Query {research_query.query} timed out after {self.query_timeout}s")
+                    return _EMPTY_RESULT
                 except Exception as e:
                     logger.error(f"Error processing query with providers: {str(e)}")
-                    return {"learnings": [], "urls": [], "follow_up_questions": [], "analyses": []}
+                    return _EMPTY_RESULT
 
-            # Process all queries concurrently - outer level parallelism
-            results = await asyncio.gather(*[process_query_with_providers(q) for q in search_queries])
+            run_query = process_query_with_providers
 
-        # Combine results from all queries
-        all_learnings = learnings.copy()
-        for result in results:
-            all_learnings.extend(result.get("learnings", []))
-        all_learnings = list(dict.fromkeys(all_learnings))
+        # Process all queries concurrently, merging follow-up questions as soon as each query finishes
+        # rather than holding every result until the slowest one is done
+        seen_questions, all_questions = set(), []
 
-        all_urls = visited_urls.copy()
-        for result in results:
-            all_urls.extend(result.get("urls", []))
-        all_urls = list(dict.fromkeys(all_urls))
+        async def run_and_merge(research_query: ResearchQuery) -> None:
+            _extend_unique(all_questions, seen_questions, await run_query(research_query))
 
-        all_questions = []
-        for result in results:
-            all_questions.extend(result.get("follow_up_questions", []))
-        all_questions = list(dict.fromkeys(all_questions))
-
-        all_analyses = analyses.copy()
-        for result in results:
-            all_analyses.extend(result.get("analyses", []))
-
-        return {
-            "learnings": all_learnings,
-            "visited_urls": all_urls,
-            "follow_up_questions": all_questions,
-            "analyses": all_analyses,
-        }
+        # a fatal error cancels the sibling queries right away instead of letting each of them fail on its own
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for research_query in search_queries:
+                    task_group.create_task(run_and_merge(research_query))
+        except* _FatalResearchError as error_group:
+            raise error_group.exceptions[0]
+        return all_questions
 
     async def _generate_report(
         self, original_query: str, research_result: ResearchResult, personality_provider=None
@@ -567,63 +914,27 @@ class ResearchWorkflow:
         learnings_str = "\n".join([f"- {learning}" for learning in research_result["learnings"]])
 
         # Format analyses as a JSON string for the prompt
-        analyses_str = json.dumps(
+        analyses_str = orjson.dumps(
             [
                 {"query": analysis.get("query", ""), "analysis": analysis.get("analysis", "")}
                 for analysis in research_result.get("analyses", [])
             ],
-            indent=2,
-        )
+            option=orjson.OPT_INDENT_2,
+        ).decode()
 
         system_prompt = self._get_report_system_prompt()
 
-        prompt = f"""
-        Given the following prompt from the user, write a final report on the topic using
-        the learnings from research. Return a JSON object with a 'reportMarkdown' field
-        containing a detailed markdown report (aim for 3+ pages). Include ALL the learnings
-        from research:
-        <prompt>
-        {original_query}
-        </prompt>
-
-        Here are all the learnings from research:
-        <learnings>
-        {learnings_str}
-        </learnings>
-
-        Here are all the analyses from research:
-        <analyses>
-        {analyses_str}
-        </analyses>
-
-        Create a dynamic amount of sections and subsections based on the content provided. Make sure to cover all the content and provide a comprehensive analysis.
-        At a minimum, include the following sections:
-        - Key findings and main themes
-        - Source credibility and diversity
-        - Information completeness and gaps
-        - Emerging patterns and trends
-        - Potential biases or conflicting information
-        Make sure that for every relevant topic, you include a section and any subsctions it might need. Aside from the final conclusion, you should have at least 5 sections of subtopics and a sub conclusion per section.
-        IMPORTANT: Aim for at least 3+ pages of content, don't be afraid to add more sections and subsections.
-        IMPORTANT: Be verbose and detailed in your analysis. Don't over summarize, don't over simplify. Make as many sections and subsections as needed.
-
-        IMPORTANT: MAKE SURE YOU RETURN THE JSON ONLY, NO OTHER TEXT OR MARKUP AND A VALID JSON.
-        IMPORTANT: DONT ADD ANY COMMENTS OR MARKUP TO THE JSON. Example NO # or /* */ or /* */ or // or ``` or JSON or json or any other comments or markup.
-        IMPORTANT: MAKE SURE YOU RETURN THE JSON ONLY, JSON SHOULD BE PERFECTLY FORMATTED. ALL KEYS SHOULD BE OPENED AND CLOSED.
-        """
-        if self.report_model:
-            response, _, _ = await self.llm_provider.call(
-                system_prompt=system_prompt, user_prompt=prompt, temperature=0.3, model_id=self.report_model
-            )
-        else:
-            # Pass None explicitly if self.report_model is None
-            response, _, _ = await self.llm_provider.call(
-                system_prompt=system_prompt, user_prompt=prompt, temperature=0.3
-            )
+        prompt = _REPORT_TEMPLATE.format(query=original_query, learnings=learnings_str, analyses=analyses_str)
+        response = await self._cached_call(
+            system_prompt=system_prompt,
+            user_prompt=prompt,
+            temperature=0.3,
+            model_id=self.report_model,
+            cache_segments=_cache_segments(prompt, "<prompt>"),
+        )
 
         try:
-            cleaned_response = response.replace("```json", "").replace("```", "").strip()
-            result = json.loads(cleaned_response)
+            result = _parse_llm_json(response)
             report = result.get("reportMarkdown", "Error generating report")
             # Add sources section
             sources = "\n\n## Sources\n\n" + "\n".join([f"- {url}" for url in research_result["visited_urls"]])
@@ -631,7 +942,7 @@ class ResearchWorkflow:
             return report + sources
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing report JSON: {e}")
-            logger.debug(f"Raw response: {response}")
+            logger.debug("Raw response: %s", response)
 
             # Fallback report generation
             return (
@@ -644,67 +955,44 @@ class ResearchWorkflow:
                 + response
             )
 
-    def _get_system_prompt(self) -> str:
-        """Get the system prompt for research operations"""
-        return """You are an expert research analyst that processes web search results.
-        Analyze the content and provide insights about for each section you identify:
-        1. Key findings and main themes
-        2. Source credibility and diversity
-        3. Information completeness and gaps
-        4. Emerging patterns and trends
-        5. Potential biases or conflicting information
-
-        Be thorough and detailed in your analysis. Focus on extracting concrete facts,
-        statistics, and verifiable information. Highlight any uncertainties or areas
-        needing further research.
+    async def _cached_call(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        model_id: Optional[str] = None,
+        cache_segments: Optional[List[Tuple[str, Dict]]] = None,
+    ) -> str:
+        """
+        Call the LLM provider, reusing a cached response for identical (or semantically similar) prompts.
+        cache_segments splits user_prompt into a static prefix and dynamic suffix for provider-side prompt caching.
+        """
+        cached = await self.llm_cache.get(system_prompt, user_prompt, model_id, temperature)
+        if cached is not None:
+            logger.debug("LLM cache hit")
+            return cached
+
+        kwargs = {"model_id": model_id} if model_id else {}
+        if cache_segments:
+            kwargs["cache_segments"] = cache_segments
+        response, _, _ = await self.llm_provider.call(
+            system_prompt=system_prompt, user_prompt=user_prompt, temperature=temperature, **kwargs
+        )
 
-        Return your analysis in a clear, structured format with sections for key findings,
-        detailed analysis, and recommendations for further research.
+        # every caller asks for JSON, anything else is an error message from the provider and not worth keeping
+        stripped = response.replace("```json", "").lstrip("`\n\t ") if response else ""
+        if stripped[:1] in ("{", "["):
+            await self.llm_cache.set(system_prompt, user_prompt, model_id, temperature, response)
+        return response
 
-        IMPORTANT: DON'T MAKE ANY INFORMATION UP, IT MUST BE FROM THE CONTENT PROVIDED.
-        FOLLOW THE REQUESTED JSON FORMAT EXACTLY WITH NO ADDITIONAL MARKUP OR COMMENTS."""
+    def _get_system_prompt(self) -> str:
+        """Get the system prompt for research operations"""
+        return _SYSTEM_PROMPT
 
     def _get_report_system_prompt(self) -> str:
         """Get the system prompt specifically for report generation"""
-        return """
-        {
-            "role": "You are an expert researcher specializing in producing exhaustive, analytically rigorous research reports.",
-            "instructions": [
-                "When responding, assume all provided facts—especially those after your knowledge cutoff—are accurate unless contradicted internally.",
-                "The user is a highly experienced analyst. Do not simplify. Prioritize technical precision, domain-specific terminology, and comprehensive argumentation.",
-                "Organize the report with multiple clearly defined sections, such as: Executive Summary, Background, Market Landscape, Problem Analysis, Technological Trends, Competitive Analysis, Risk Factors, Opportunities, Speculative Insights (clearly marked), Strategic Recommendations, and Conclusion.",
-                "Each section should be verbose, detailed, and data-driven where possible. Aim for high information density.",
-                "Anticipate what the user might need to know next. Include frameworks, mental models, and decision trees where relevant.",
-                "Suggest novel or unconventional strategies the user may not have considered. Prioritize unique insight over consensus.",
-                "Include emerging technologies, trends, and contrarian ideas. Be aggressive in surfacing innovations, and clearly identify areas of high uncertainty or risk.",
-                "Do not cite sources by name unless necessary—strong reasoning is preferred over appeal to authority.",
-                "You may speculate about future developments, but you must clearly mark any speculative or high-uncertainty claims.",
-                "Use precise definitions, models, and numerical reasoning where appropriate.",
-                "Provide critical evaluation of ideas, trade-offs, and second-order consequences.",
-                "When delivering the report, ALWAYS return a single, clean JSON object and NOTHING ELSE.",
-                "The JSON MUST be valid and properly formatted. No comments, markdown, or other markup is allowed.",
-                "ALL KEYS in the JSON must be properly opened and closed with quotation marks."
-                "IMPORTANT: MAKE SURE YOU RETURN THE JSON ONLY, NO OTHER TEXT OR MARKUP AND A VALID JSON."
-                "DONT ADD ANY COMMENTS OR MARKUP TO THE JSON. Example NO # or /* */ or /* */ or // or any other comments or markup."
-            ]
-        }
-
-        """
+        return _REPORT_SYSTEM_PROMPT
 
     def _get_report_system_prompt2(self) -> str:
         """Get the system prompt specifically for report generation"""
-        return """You are an expert researcher preparing comprehensive research reports.
-        Follow these instructions when responding:
-        - You may be asked to research subjects that is after your knowledge cutoff, assume the user is right when presented with news.
-        - The user is a highly experienced analyst, no need to simplify it, be as detailed as possible and make sure your response is correct.
-        - Be highly organized with clear headings and structure.
-        - Suggest solutions that I didn't think about.
-        - Be proactive and anticipate my needs.
-        - Provide detailed explanations with supporting evidence.
-        - Value good arguments over authorities, the source is irrelevant.
-        - Consider new technologies and contrarian ideas, not just the conventional wisdom.
-        - You may use high levels of speculation or prediction, just flag it for me.
-
-        IMPORTANT: MAKE SURE YOU RETURN THE JSON ONLY, NO OTHER TEXT OR MARKUP AND A VALID JSON.
-        DONT ADD ANY COMMENTS OR MARKUP TO THE JSON. Example NO # or /* */ or /* */ or // or any other comments or markup.
-        MAKE SURE YOU RETURN THE JSON ONLY, JSON SHOULD BE PERFECTLY FORMATTED. ALL KEYS SHOULD BE OPENED AND CLOSED."""
+        return _REPORT_SYSTEM_PROMPT2
@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Protocol, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    """Storage used by LLMCache, e.g. an in-process LRU or a shared Redis instance"""
+
+    async def get(self, key: str) -> Optional[str]: ...
+
+    async def set(self, key: str, value: str, ttl: int) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class InMemoryBackend:
+    """LRU cache with per-entry expiry, local to the current process"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class LLMCache:
+    """
+    Cache for LLM responses keyed by (system prompt, user prompt, model, temperature).
+
+    When an embedding function is given, a miss on the exact key falls back to a semantic lookup:
+    the user prompt is embedded and compared against the prompts cached so far, and the response of
+    the closest one is reused if its cosine similarity exceeds the threshold.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: int = 3600,
+        max_size: int = 1024,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        similarity_threshold: float = 0.92,
+    ):
+        """
+        Args:
+            backend: Where responses are stored, defaults to an in-process LRU
+            ttl: Seconds a cached response stays valid
+            max_size: Maximum entries for the default backend and the semantic index
+            embed_fn: Optional synchronous function returning an embedding for a text, enables semantic lookups
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.backend = backend or InMemoryBackend(max_size=max_size)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        # semantic index: normalized prompt embeddings, grouped by the exact-match context they belong to
+        self._semantic_keys: List[Tuple[str, str]] = []
+        self._semantic_matrix = None
+
+    @staticmethod
+    def make_key(system_prompt: str, user_prompt: str, model_id: Optional[str], temperature: float) -> str:
+        payload = json.dumps(
+            {"system": system_prompt, "user": user_prompt, "model": model_id, "temperature": temperature},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _context_key(system_prompt: str, model_id: Optional[str], temperature: float) -> str:
+        # semantic hits are only allowed between prompts sent with the same system prompt and settings
+        return LLMCache.make_key(system_prompt, "", model_id, temperature)
+
+    async def get(
+        self, system_prompt: str, user_prompt: str, model_id: Optional[str], temperature: float
+    ) -> Optional[str]:
+        key = self.make_key(system_prompt, user_prompt, model_id, temperature)
+        value = await self.backend.get(key)
+        if value is not None or self.embed_fn is None or self._semantic_matrix is None:
+            return value
+
+        similar_key = await self._find_similar(user_prompt, self._context_key(system_prompt, model_id, temperature))
+        if similar_key is None:
+            return None
+        return await self.backend.get(similar_key)
+
+    async def set(
+        self, system_prompt: str, user_prompt: str, model_id: Optional[str], temperature: float, response: str
+    ) -> None:
+        key = self.make_key(system_prompt, user_prompt, model_id, temperature)
+        await self.backend.set(key, response, self.ttl)
+        if self.embed_fn is not None:
+            await self._index(user_prompt, self._context_key(system_prompt, model_id, temperature), key)
+
+    async def _embed(self, text: str):
+        import numpy as np
+
+        try:
+            vector = np.asarray(await asyncio.to_thread(self.embed_fn, text), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Failed to embed prompt for semantic cache: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    async def _index(self, user_prompt: str, context_key: str, key: str) -> None:
+        import numpy as np
+
+        vector = await self._embed(user_prompt)
+        if vector is None:
+            return
+        if self._semantic_matrix is None:
+            self._semantic_matrix = vector[np.newaxis, :]
+        else:
+            self._semantic_matrix = np.vstack([self._semantic_matrix, vector])
+        self._semantic_keys.append((context_key, key))
+
+        # drop the oldest embeddings once the index outgrows the cache
+        overflow = len(self._semantic_keys) - self.max_size
+        if overflow > 0:
+            self._semantic_keys = self._semantic_keys[overflow:]
+            self._semantic_matrix = self._semantic_matrix[overflow:]
+
+    async def _find_similar(self, user_prompt: str, context_key: str) -> Optional[str]:
+        import numpy as np
+
+        vector = await self._embed(user_prompt)
+        if vector is None:
+            return None
+        similarities = self._semantic_matrix @ vector
+        for index in np.argsort(similarities)[::-1]:
+            if similarities[index] < self.similarity_threshold:
+                break
+            candidate_context, candidate_key = self._semantic_keys[index]
+            if candidate_context == context_key:
+                logger.debug("Semantic LLM cache hit with similarity %.3f", similarities[index])
+                return candidate_key
+        return None
@@ -1,137 +1,338 @@
 import asyncio
+import inspect
+import io
+import itertools
+import json
 import logging
-from datetime import datetime, timedelta
+import math
+import os
+import pickle
+import random
+import statistics
+import time
+from collections import OrderedDict, deque
 from functools import wraps
 from typing import Any, Callable, TypeVar
 
+try:
+    import xxhash
+
+    def _new_hasher():
+        return xxhash.xxh3_128()
+
+except ImportError:  # xxhash is optional, the stdlib blake2b is slower but needs no extra wheel
+    import hashlib
+
+    def _new_hasher():
+        return hashlib.blake2b(digest_size=16)
+
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound=Callable)
 
 
-# Features:
-# Shares cache across all instances of the same agent class
-# Python's dict operations are atomic so it's thread-safe
-def with_cache(ttl_seconds: int = 300):
-    """Cache function results for specified duration"""
-    import hashlib
-    import json
+class _HashWriter(io.RawIOBase):
+    """Write-only file object feeding everything written to it into a hash"""
 
-    def decorator(func: T) -> T:
-        # Move cache to class level using a unique key
-        cache_key_base = f"_cache_{func.__name__}"
-        ttl_key = f"_cache_ttl_{func.__name__}"
-        hits_key = f"_cache_hits_{func.__name__}"
-        misses_key = f"_cache_misses_{func.__name__}"
+    def __init__(self, hasher):
+        self._hasher = hasher
 
-        @wraps(func)
-        async def wrapper(self, *args, **kwargs) -> Any:
-            # Initialize class-level cache and stats
-            if not hasattr(self.__class__, cache_key_base):
-                setattr(self.__class__, cache_key_base, {})
-                setattr(self.__class__, ttl_key, {})
-                setattr(self.__class__, hits_key, 0)
-                setattr(self.__class__, misses_key, 0)
+    def writable(self) -> bool:
+        return True
 
-            cache = getattr(self.__class__, cache_key_base)
-            cache_ttl = getattr(self.__class__, ttl_key)
+    def write(self, data) -> int:
+        self._hasher.update(data)
+        return len(data)
 
-            # Use a more stable cache key method
-            try:
-                # First try to create a JSON-based key with sorted keys
-                args_str = json.dumps(args, sort_keys=True, default=str)
-                kwargs_str = json.dumps(sorted(kwargs.items()), default=str)
 
-                # Create a hash for potentially large inputs
-                key_material = f"{func.__name__}:{args_str}:{kwargs_str}"
-                cache_key = hashlib.md5(key_material.encode()).hexdigest()
+def _make_cache_key(args: tuple, kwargs: dict) -> bytes:
+    """
+    Hash the call arguments by streaming their pickle straight into a fast non-cryptographic hash,
+    so no serialized copy of large arguments is ever built. Falls back to JSON for unpicklable arguments.
+    Returns the raw 16-byte digest, which is smaller and cheaper to hash as a dict key than its hex form.
+    """
+    hasher = _new_hasher()
+    try:
+        with io.BufferedWriter(_HashWriter(hasher)) as sink:
+            # out-of-band buffers (e.g. large arrays) are hashed in place instead of being copied into the stream
+            pickler = pickle.Pickler(sink, protocol=5, buffer_callback=lambda buffer: hasher.update(buffer.raw()))
+            # without the memo, equal objects pickle the same whether or not they are the same object
+            pickler.fast = True
+            # keyword order doesn't change the call, so it mustn't change the key either
+            pickler.dump((args, sorted(kwargs.items())))
+    except (pickle.PicklingError, TypeError, AttributeError, BufferError, ValueError):
+        hasher = _new_hasher()
+        hasher.update(json.dumps([args, kwargs], sort_keys=True, default=str).encode())
+    return hasher.digest()
 
-            except (TypeError, ValueError):
-                # Fallback to string representation if JSON serialization fails
-                cache_key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
-                logger.warning(f"Using fallback cache key generation for {func.__name__}")
 
-            # Add debug logging
-            logger.debug(f"Cache key for {func.__name__}: {cache_key}")
+# Number of least recently used entries that compete for eviction, at most a tenth of the cache
+_EVICTION_BAND = 128
 
-            # Check cache
-            if cache_key in cache and datetime.now() < cache_ttl[cache_key]:
-                # Update hit stats
-                setattr(self.__class__, hits_key, getattr(self.__class__, hits_key) + 1)
-                logger.debug(f"Cache hit for {func.__name__} with key {cache_key}")
-                return cache[cache_key]
+
+def _caching_value(entry: list, now: float) -> float:
+    """Log-scaled value of keeping a cache entry: its recompute latency weighted by its observed hit rate"""
+    expiry, _, hits, latency, _ = entry
+    if now >= expiry:
+        return -math.inf
+    hit_prob = hits / (hits + 1)
+    return math.log(latency * hit_prob + hit_prob + 1e-6)
+
+
+def _evict_one(cache: OrderedDict) -> None:
+    """Evict the least valuable entry among the least recently used ones (expired entries go first)"""
+    band = max(1, min(len(cache) // 10, _EVICTION_BAND))
+    now = time.monotonic()
+    victim, _ = min(itertools.islice(cache.items(), band), key=lambda item: _caching_value(item[1], now))
+    del cache[victim]
+
+
+def _should_admit(latency: float, latencies: deque) -> bool:
+    """Admit results to a full cache with a probability proportional to how expensive they were to compute"""
+    median = statistics.median(latencies)
+    return median <= 0 or random.random() < latency / median
+
+
+# Shared cross-process cache used behind the in-process one when REDIS_URL is set, created on first use.
+# Its connection pool is bound to the event loop it was created on, so a new loop (another asyncio.run) gets its own.
+_redis_client = None
+_redis_loop = None
+
+
+def _get_redis():
+    """Return the redis.asyncio client for REDIS_URL on the running loop, or None when no Redis is configured"""
+    global _redis_client, _redis_loop
+    loop = asyncio.get_running_loop()
+    if _redis_loop is not loop:
+        if not os.getenv("REDIS_URL"):
+            return None
+        import redis.asyncio as redis
+
+        _redis_client = redis.from_url(os.environ["REDIS_URL"])
+        _redis_loop = loop
+    return _redis_client
+
+
+async def _redis_get(client, key: bytes):
+    """Fetch a cached result and its remaining TTL in seconds, or None on a miss or any Redis error"""
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            payload, ttl_ms = await pipe.get(key).pttl(key).execute()
+        if payload is None or ttl_ms <= 0:
+            return None
+        # results are pickled, so the Redis instance must only be writable by trusted processes
+        return pickle.loads(payload), ttl_ms / 1000
+    except Exception as e:
+        logger.warning("Redis cache lookup failed for %s: %s", key.hex(), e)
+        return None
+
+
+async def _redis_set(client, key: bytes, result: Any, ttl_seconds: int) -> None:
+    try:
+        await client.set(key, pickle.dumps(result, protocol=5), ex=ttl_seconds, nx=True)
+    except Exception as e:
+        logger.warning("Redis cache store failed for %s: %s", key.hex(), e)
+
+
+# Features:
+# Shares cache across all instances of the same agent class (one cache per decorated method)
+# Python's dict operations are atomic so it's thread-safe
+# The cache and [hits, misses] counters are exposed as `cache` and `cache_stats` on the decorated method
+# With REDIS_URL set, misses are looked up in Redis before computing, so results survive restarts and are shared
+# between processes
+# Concurrent calls with the same arguments share one in-flight computation instead of each calling the function
+# With stale_ttl_seconds set, expired results keep being served for that long while a refresh runs in the background
+def with_cache(
+    ttl_seconds: int = 300,
+    maxsize: int = 10000,
+    error_ttl_seconds: int = 0,
+    stale_ttl_seconds: int = 0,
+    ttl_for: Callable[[dict], int] = None,
+):
+    """
+    Cache function results for specified duration, keeping at most maxsize entries.
+    Error responses are not cached, unless error_ttl_seconds is set to keep them in-process for that long.
+    Once the cache is full, cheap results are only admitted with a probability proportional to their latency,
+    and eviction removes the entry with the lowest latency-times-hit-rate among the least recently used ones.
+    ttl_for, if given, receives the call's arguments by name and returns the TTL for that result instead of
+    ttl_seconds. For stale_ttl_seconds after a result expires, callers still get it immediately while one call
+    refreshes it in the background.
+    """
+
+    def decorator(func: T) -> T:
+        # State lives in the closure, so the hot path needs no attribute lookups
+        # LRU order, each entry is [monotonic expiry, result, hits, latency, monotonic end of freshness]
+        cache = OrderedDict()
+        stats = [0, 0]  # hits, misses
+        # recent call latencies, used to judge how expensive a result was
+        latencies = deque(maxlen=256)
+        redis_prefix = f"with_cache:{func.__module__}.{func.__qualname__}:".encode()
+        # futures of the calls currently computing a result, so concurrent identical calls share one
+        inflight = {}
+        # background refreshes of stale results, referenced until done so they aren't garbage collected
+        refreshes = set()
+        signature = inspect.signature(func) if ttl_for is not None else None
+
+        def result_ttl(self, args: tuple, kwargs: dict) -> int:
+            if ttl_for is None:
+                return ttl_seconds
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop(next(iter(signature.parameters)))
+            return ttl_for(arguments)
+
+        async def load(self, cache_key: bytes, args: tuple, kwargs: dict) -> Any:
+            """Resolve an in-process miss from Redis or by calling the function, filling the caches"""
+            redis_client = _get_redis()
+            if redis_client is not None:
+                cached = await _redis_get(redis_client, redis_prefix + cache_key)
+                if cached is not None:
+                    result, ttl_left = cached
+                    stats[0] += 1
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Redis cache hit for %s with key %s", func.__name__, cache_key.hex())
+                    if cache_key in cache or len(cache) < maxsize:
+                        expiry = time.monotonic() + ttl_left
+                        cache[cache_key] = [expiry, result, 0, 0.0, expiry]
+                        cache.move_to_end(cache_key)
+                    return result
 
             # Update miss stats
-            setattr(self.__class__, misses_key, getattr(self.__class__, misses_key) + 1)
-            logger.debug(f"Cache miss for {func.__name__} with key {cache_key}")
+            stats[1] += 1
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Cache miss for %s with key %s", func.__name__, cache_key.hex())
 
             # Execute function
+            started = time.perf_counter()
             result = await func(self, *args, **kwargs)
+            latency = time.perf_counter() - started
+            latencies.append(latency)
 
             # Only cache successful responses
             # Check if result is a dict with error key or has a status that indicates error
             should_cache = True
             if isinstance(result, dict):
                 if "error" in result or result.get("status") == "error":
-                    # Don't cache error responses
+                    # Don't cache error responses, beyond the optional short error TTL
                     should_cache = False
-                    logger.debug(f"Skipping cache for error response from {func.__name__}")
-
-            # Update cache only for successful responses
-            if should_cache:
-                cache[cache_key] = result
-                cache_ttl[cache_key] = datetime.now() + timedelta(seconds=ttl_seconds)
-
-            # Limit cache size to prevent memory issues (keep last 100 entries)
-            if len(cache) > 10000:
-                # Find and remove oldest entries
-                oldest_keys = sorted(cache_ttl.items(), key=lambda x: x[1])[: len(cache) - 100]
-                for k, _ in oldest_keys:
-                    if k in cache:
-                        del cache[k]
-                    if k in cache_ttl:
-                        del cache_ttl[k]
+                    logger.debug("Skipping cache for error response from %s", func.__name__)
+            entry_ttl = result_ttl(self, args, kwargs) if should_cache else error_ttl_seconds
+            stale_ttl = stale_ttl_seconds if should_cache else 0
+
+            # Update cache, keeping cheap results from displacing expensive ones; a key already cached is always
+            # replaced, so a background refresh can't leave its stale entry in place
+            if entry_ttl > 0 and (cache_key in cache or len(cache) < maxsize or _should_admit(latency, latencies)):
+                fresh_until = time.monotonic() + entry_ttl
+                cache[cache_key] = [fresh_until + stale_ttl, result, 0, latency, fresh_until]
+                cache.move_to_end(cache_key)
+                # Limit cache size to prevent memory issues
+                while len(cache) > maxsize:
+                    _evict_one(cache)
+            if should_cache and redis_client is not None:
+                await _redis_set(redis_client, redis_prefix + cache_key, result, entry_ttl)
 
             return result
 
-        return wrapper
-
-    return decorator
+        def claim(cache_key: bytes) -> asyncio.Future:
+            """Register a call as computing cache_key, so identical calls made meanwhile join it"""
+            future = asyncio.get_running_loop().create_future()
+            inflight[cache_key] = future
+            return future
 
+        async def compute(self, cache_key: bytes, args: tuple, kwargs: dict, future: asyncio.Future) -> Any:
+            """Load a result and hand it to the callers waiting on future"""
+            try:
+                result = await load(self, cache_key, args, kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except BaseException as e:
+                future.set_exception(e)
+                future.exception()  # mark retrieved, callers that joined still get it raised
+                raise
+            finally:
+                inflight.pop(cache_key, None)
+            future.set_result(result)
+            return result
 
-# TODO: Use Redis in a multi-process environment
-# def with_cache(ttl_seconds: int = 300):
-#     """Cache function results using Redis"""
-#     def decorator(func: T) -> T:
-#         redis_client = redis.Redis(host='localhost', port=6379, db=0)
+        async def refresh(self, cache_key: bytes, args: tuple, kwargs: dict, future: asyncio.Future) -> None:
+            try:
+                await compute(self, cache_key, args, kwargs, future)
+            except Exception as e:
+                # the stale result stays in place until it expires
+                logger.warning("Background refresh of %s failed: %s", func.__name__, e)
 
-#         @wraps(func)
-#         async def wrapper(*args, **kwargs) -> Any:
-#             cache_key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs) -> Any:
+            # Use a more stable cache key method
+            try:
+                cache_key = _make_cache_key(args, kwargs)
+            except (TypeError, ValueError):
+                # Fallback to string representation if serialization fails
+                cache_key = f"{func.__name__}:{str(args)}:{str(kwargs)}".encode()
+                logger.warning("Using fallback cache key generation for %s", func.__name__)
 
-#             # Check Redis cache
-#             cached = redis_client.get(cache_key)
-#             if cached:
-#                 logger.debug(f"Cache hit for {func.__name__}")
-#                 return json.loads(cached)
+            # Check cache
+            entry = cache.get(cache_key)
+            if entry is not None and (now := time.monotonic()) < entry[0]:
+                cache.move_to_end(cache_key)
+                entry[2] += 1
+                # Update hit stats
+                stats[0] += 1
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Cache hit for %s with key %s", func.__name__, cache_key.hex())
+                if now >= entry[4] and cache_key not in inflight:
+                    # stale: answer now and refresh for the next callers
+                    task = asyncio.create_task(refresh(self, cache_key, args, kwargs, claim(cache_key)))
+                    refreshes.add(task)
+                    task.add_done_callback(refreshes.discard)
+                return entry[1]
+
+            # Join a call already computing the same result instead of starting another one
+            loop = asyncio.get_running_loop()
+            while (pending := inflight.get(cache_key)) is not None and pending.get_loop() is loop:
+                try:
+                    result = await asyncio.shield(pending)
+                except asyncio.CancelledError:
+                    # retry only if the call we joined was cancelled, not this one
+                    if not pending.cancelled() or asyncio.current_task().cancelling():
+                        raise
+                    continue
+                stats[0] += 1
+                return result
 
-#             # Execute function
-#             result = await func(*args, **kwargs)
+            return await compute(self, cache_key, args, kwargs, claim(cache_key))
 
-#             # Update Redis cache
-#             redis_client.setex(
-#                 cache_key,
-#                 ttl_seconds,
-#                 json.dumps(result)
-#             )
+        wrapper.cache = cache
+        wrapper.cache_stats = stats
+        return wrapper
 
-#             return result
-#         return wrapper
-#     return decorator
+    return decorator
 
 
-def with_retry(max_retries: int = 3, delay: float = 1.0):
-    """Retry function execution on failure"""
+def _is_client_error(error: BaseException) -> bool:
+    """Client errors (4xx other than timeouts and rate limits) won't succeed on retry"""
+    status = getattr(error, "status", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500 and status not in (408, 429)
+
+
+def with_retry(
+    max_retries: int = 3,
+    delay: float = 1.0,
+    retry_on: tuple[type[BaseException], ...] = (Exception,),
+    jitter: float = 0.25,
+    max_delay: float = None,
+    full_jitter: bool = False,
+):
+    """
+    Retry function execution on failure with exponential backoff, randomized by +/- jitter so that
+    callers failing together don't retry in lockstep. Only exceptions in retry_on are retried,
+    and client errors are raised immediately.
+    The backoff is capped at max_delay if given, and with full_jitter each wait is drawn uniformly
+    between zero and the backoff instead.
+    """
 
     def decorator(func: T) -> T:
         @wraps(func)
@@ -140,11 +341,29 @@ def with_retry(max_retries: int = 3, delay: float = 1.0):
             for attempt in range(max_retries):
                 try:
                     return await func(*args, **kwargs)
-                except Exception as e:
+                except asyncio.CancelledError:
+                    raise
+                except retry_on as e:
+                    if _is_client_error(e):
+                        logger.error(f"Not retrying {func.__name__} after client error: {e}")
+                        raise
                     last_error = e
                     if attempt < max_retries - 1:
-                        delay_time = delay * (2**attempt)  # Exponential backoff
-                        logger.warning(f"Retry {attempt + 1}/{max_retries} for {func.__name__} after {delay_time}s")
+                        backoff = delay * (2**attempt)
+                        if max_delay is not None:
+                            backoff = min(backoff, max_delay)
+                        if full_jitter:
+                            delay_time = random.uniform(0, backoff)
+                        else:
+                            delay_time = backoff * (1 + random.uniform(-jitter, jitter))
+                        logger.warning(
+                            "Retry %d/%d for %s after %.2fs (%s)",
+                            attempt + 1,
+                            max_retries,
+                            func.__name__,
+                            delay_time,
+                            type(e).__name__,
+                        )
                         await asyncio.sleep(delay_time)
 
             logger.error(f"All retries failed for {func.__name__}: {last_error}")
@@ -161,15 +380,15 @@ def monitor_execution():
     def decorator(func: T) -> T:
         @wraps(func)
         async def wrapper(*args, **kwargs) -> Any:
-            start_time = datetime.now()
+            start_time = time.perf_counter_ns()
             try:
                 result = await func(*args, **kwargs)
-                execution_time = (datetime.now() - start_time).total_seconds()
-                logger.info(f"{func.__name__} executed successfully in {execution_time:.2f}s")
+                execution_time = (time.perf_counter_ns() - start_time) / 1e9
+                logger.info("%s executed successfully in %.2fs", func.__name__, execution_time)
                 return result
             except Exception as e:
-                execution_time = (datetime.now() - start_time).total_seconds()
-                logger.error(f"{func.__name__} failed after {execution_time:.2f}s: {e}")
+                execution_time = (time.perf_counter_ns() - start_time) / 1e9
+                logger.error("%s failed after %.2fs: %s", func.__name__, execution_time, e)
                 raise
 
         return wrapper
@@ -1,7 +1,9 @@
 import asyncio
-import json
+import atexit
 import logging
+import mmap
 import os
+import re
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
@@ -9,9 +11,11 @@ from typing import Optional
 
 import click
 import httpx
+import orjson
 from dotenv import load_dotenv
 from heurist_mesh_client.client import MeshClient
-from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
+from prometheus_client import CollectorRegistry, push_to_gateway
+from prometheus_client.core import GaugeMetricFamily
 
 
 # Logger setup
@@ -58,38 +62,97 @@ JOB_NAME = os.getenv("JOB_NAME", "MESH_AGENTS_DAILY_CHECK")
 INTERVAL = 172800  # 48 hours
 NUM_WORKERS = 4
 TEST_PER_WORKER = 4
+MAX_CONCURRENT_AGENTS = 8
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 TEST_INPUTS_FILE = os.path.join(SCRIPT_DIR, "test_inputs.json")
 DISABLED_AGENTS = {"DeepResearchAgent", "MemoryAgent", "ArbusAgent"}
 
+# parsed test inputs keyed by the file's mtime, and the last metadata payload with its conditional request headers
+_TEST_INPUTS_CACHE: tuple[float, dict] | None = None
+_METADATA_CACHE: tuple[dict, dict] | None = None
+
+# kept open for the life of the process so repeated metadata fetches reuse the pooled connection
+_METADATA_CLIENT = httpx.Client(timeout=30, limits=httpx.Limits(max_keepalive_connections=8))
+atexit.register(_METADATA_CLIENT.close)
+
+# where agents report failures in a raw response, probed in order; "message" only counts when it mentions an error
+_ERR_PATHS = (("error",), ("errorMessage",), ("message",), ("data", "error"), ("data", "errorMessage"))
+_ERR_RE = re.compile(r"error", re.IGNORECASE)
+
 
 def is_agent_hidden(agent_data: dict) -> bool:
     return agent_data.get("metadata", {}).get("hidden", False) is True
 
 
+def index_enabled_agents(agents_metadata: dict) -> dict[str, frozenset[str]]:
+    """Map each testable agent (not disabled or hidden) to the names of its tools"""
+    return {
+        agent_id: frozenset(t["function"]["name"] for t in agent_data.get("tools", []))
+        for agent_id, agent_data in agents_metadata["agents"].items()
+        if agent_id not in DISABLED_AGENTS and not is_agent_hidden(agent_data)
+    }
+
+
 def fetch_agents_metadata() -> dict:
+    global _METADATA_CACHE
+    headers = _METADATA_CACHE[0] if _METADATA_CACHE else {}
     try:
-        with httpx.Client() as client:
-            response = client.get(MESH_METADATA_URL)
-            response.raise_for_status()
-            return response.json()
+        response = _METADATA_CLIENT.get(MESH_METADATA_URL, headers=headers)
+        if response.status_code == 304 and _METADATA_CACHE:
+            return _METADATA_CACHE[1]
+        response.raise_for_status()
+        metadata = orjson.loads(response.content)
+        validators = {}
+        if etag := response.headers.get("ETag"):
+            validators["If-None-Match"] = etag
+        if last_modified := response.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = last_modified
+        _METADATA_CACHE = (validators, metadata) if validators else None
+        return metadata
     except Exception as e:
         logger.error(f"Error fetching metadata: {e}")
         return {"agents": {}}
 
 
 def load_test_inputs() -> dict:
+    global _TEST_INPUTS_CACHE
     if not os.path.exists(TEST_INPUTS_FILE):
         logger.error(f"Test inputs file not found: {TEST_INPUTS_FILE}")
         return {}
     try:
-        with open(TEST_INPUTS_FILE, "r") as f:
-            return json.load(f)
+        mtime = os.stat(TEST_INPUTS_FILE).st_mtime
+        if _TEST_INPUTS_CACHE and _TEST_INPUTS_CACHE[0] == mtime:
+            return _TEST_INPUTS_CACHE[1]
+        with open(TEST_INPUTS_FILE, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                test_inputs = orjson.loads(view)
+        _TEST_INPUTS_CACHE = (mtime, test_inputs)
+        return test_inputs
     except Exception as e:
         logger.error(f"Error loading test inputs: {e}")
         return {}
 
 
+def _lookup(obj, path: tuple[str, ...]):
+    for key in path:
+        obj = obj.get(key) if isinstance(obj, dict) else None
+    return obj
+
+
+def _extract_error(result) -> Optional[str]:
+    for path in _ERR_PATHS:
+        error = _lookup(result, path)
+        if error and (path[0] != "message" or (isinstance(error, str) and _ERR_RE.search(error))):
+            return error
+    results = _lookup(result, ("data", "results"))
+    if isinstance(results, dict) and results.get("code", 0) != 0:
+        error = f"{results.get('msg', 'Unknown error')} (code: {results['code']})"
+        if "detail" in results:
+            error += f" - {results['detail']}"
+        return error
+    return None
+
+
 def execute_test(
     client: MeshClient, agent_id: str, tool_name: str, inputs: dict
 ) -> tuple[Optional[str], float, Optional[dict]]:
@@ -97,28 +160,7 @@ def execute_test(
     try:
         result = client.sync_request(agent_id=agent_id, tool=tool_name, tool_arguments=inputs, raw_data_only=True)
         elapsed = time.time() - start_time
-        error = None
-        if isinstance(result, dict):
-            if "error" in result:
-                error = result["error"]
-            elif "errorMessage" in result:
-                error = result["errorMessage"]
-            elif "message" in result and isinstance(result["message"], str) and "error" in result["message"].lower():
-                error = result["message"]
-            elif "data" in result and isinstance(result["data"], dict):
-                if "error" in result["data"]:
-                    error = result["data"]["error"]
-                elif "errorMessage" in result["data"]:
-                    error = result["data"]["errorMessage"]
-                elif "results" in result["data"] and isinstance(result["data"]["results"], dict):
-                    results = result["data"]["results"]
-                    if "code" in results and results.get("code") != 0:
-                        error = f"{results.get('msg', 'Unknown error')} (code: {results['code']})"
-                        if "detail" in results:
-                            error += f" - {results['detail']}"
-            if not error and "response" in result:
-                if not result["response"] and isinstance(result.get("data"), dict) and result["data"].get("error"):
-                    error = result["data"]["error"]
+        error = _extract_error(result)
         if error:
             logger.error(f"Test failed for {agent_id} - {tool_name}: {error}")
         else:
@@ -130,84 +172,93 @@ def execute_test(
         return str(e), elapsed, None
 
 
-def test_tool(client: MeshClient, agent_id: str, tool_name: str, inputs: dict) -> tuple[float, int, int]:
-    total_latency = 0.0
-    success_count = 0
-    total_tests = TEST_PER_WORKER
-    for _ in range(TEST_PER_WORKER):
-        error, elapsed, _ = execute_test(client, agent_id, tool_name, inputs)
-        total_latency += elapsed
-        if not error:
-            success_count += 1
-    return total_latency, success_count, total_tests
+class _MetricsSnapshot:
+    """Collector exposing metric families that were fully built before the push"""
+
+    def __init__(self, *families: GaugeMetricFamily):
+        self.families = families
+
+    def collect(self):
+        yield from self.families
 
 
 async def push_to_prometheus(stats: dict):
     try:
-        registry = CollectorRegistry()
+        latency_family = GaugeMetricFamily("mesh_agent_latency_seconds", "Average latency per agent", labels=["agent"])
+        success_family = GaugeMetricFamily(
+            "mesh_agent_success_rate", "Success rate per agent (percentage)", labels=["agent"]
+        )
         for agent_id, (total_latency, success_count, total_tests) in stats.items():
-            metric_name = agent_id.replace("-", "_").replace(" ", "_")
             avg_latency = total_latency / total_tests if total_tests > 0 else 0.0
             success_rate = (success_count / total_tests * 100) if total_tests > 0 else 0.0
-            latency_metric = Gauge(f"{metric_name}_latency", f"Average latency for {agent_id}", registry=registry)
-            latency_metric.set(avg_latency if avg_latency else float("nan"))
-            success_metric = Gauge(
-                f"{metric_name}_success_rate", f"Success rate for {agent_id} (percentage)", registry=registry
-            )
-            success_metric.set(success_rate)
+            latency_family.add_metric([agent_id], avg_latency if avg_latency else float("nan"))
+            success_family.add_metric([agent_id], success_rate)
             logger.info(f"Pushing metrics for {agent_id}: success_rate={success_rate:.2f}%, latency={avg_latency:.2f}s")
+        registry = CollectorRegistry()
+        registry.register(_MetricsSnapshot(latency_family, success_family))
         push_to_gateway(PUSHGATEWAY_URL, job=JOB_NAME, registry=registry)
         logger.info(f"Metrics pushed to Prometheus at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     except Exception as e:
         logger.error(f"Error pushing metrics to Prometheus: {e}")
 
 
-def run_tests_for_agent(agent_id: str, client: MeshClient, test_inputs: dict, agents_metadata: dict) -> dict:
+def run_tests_for_agent(
+    agent_id: str, client: MeshClient, test_inputs: dict, enabled_agents: dict[str, frozenset[str]]
+) -> dict:
     stats = {}
-    if agent_id not in agents_metadata["agents"]:
-        logger.error(f"Agent {agent_id} not found in metadata")
-        return stats
-    if agent_id in DISABLED_AGENTS:
-        logger.info(f"Skipping disabled agent: {agent_id}")
-        return stats
-    if is_agent_hidden(agents_metadata["agents"][agent_id]):
-        logger.info(f"Skipping hidden agent: {agent_id}")
+    if agent_id not in enabled_agents:
+        logger.warning(f"Skipping agent that is missing from metadata, disabled or hidden: {agent_id}")
         return stats
-    agent_tools = {t["function"]["name"] for t in agents_metadata["agents"][agent_id].get("tools", [])}
+    agent_tools = enabled_agents[agent_id]
     total_latency = 0.0
     total_success_count = 0
     total_tests = 0
     with ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
+        # every repetition of every tool is its own task, so a tool's runs overlap instead of queueing
         futures = []
         for tool_name, inputs in test_inputs.get(agent_id, {}).items():
             if tool_name in agent_tools:
-                futures.append(executor.submit(test_tool, client, agent_id, tool_name, inputs))
+                futures.extend(
+                    executor.submit(execute_test, client, agent_id, tool_name, inputs) for _ in range(TEST_PER_WORKER)
+                )
             else:
                 logger.warning(f"Tool {tool_name} not found for agent {agent_id}")
         for future in as_completed(futures):
-            tool_latency, tool_success_count, tool_total_tests = future.result()
-            total_latency += tool_latency
-            total_success_count += tool_success_count
-            total_tests += tool_total_tests
+            error, elapsed, _ = future.result()
+            total_latency += elapsed
+            total_tests += 1
+            if not error:
+                total_success_count += 1
     if total_tests > 0:
         stats[agent_id] = (total_latency, total_success_count, total_tests)
     return stats
 
 
+async def run_agents_concurrently(
+    client: MeshClient, test_inputs: dict, enabled_agents: dict[str, frozenset[str]]
+) -> dict:
+    # agents are tested in worker threads; httpx.Client is thread-safe so the MeshClient can be shared
+    sem = asyncio.Semaphore(MAX_CONCURRENT_AGENTS)
+
+    async def run_one(agent_id: str) -> dict:
+        async with sem:
+            return await asyncio.to_thread(run_tests_for_agent, agent_id, client, test_inputs, enabled_agents)
+
+    results = await asyncio.gather(*(run_one(agent_id) for agent_id in test_inputs))
+    return {agent_id: agent_stats for result in results for agent_id, agent_stats in result.items()}
+
+
 async def run_all_tests(continuous: bool = False):
     if not os.getenv("HEURIST_API_KEY"):
         logger.error("HEURIST_API_KEY environment variable not set")
         return
-    agents_metadata = fetch_agents_metadata()
+    enabled_agents = index_enabled_agents(fetch_agents_metadata())
     test_inputs = load_test_inputs()
     client = MeshClient(base_url="https://sequencer-v2.heurist.xyz", timeout=90)
     while True:
         start_time = time.time()
         logger.info(f"Starting test batch at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        stats = {}
-        for agent_id in test_inputs.keys():
-            agent_stats = run_tests_for_agent(agent_id, client, test_inputs, agents_metadata)
-            stats.update(agent_stats)
+        stats = await run_agents_concurrently(client, test_inputs, enabled_agents)
         await push_to_prometheus(stats)
         if not continuous:
             break
@@ -230,7 +281,7 @@ async def run_specific_agent(agent_id: str):
         return
     client = MeshClient(base_url="https://sequencer-v2.heurist.xyz", timeout=90)
     logger.info(f"Starting test for agent {agent_id}")
-    stats = run_tests_for_agent(agent_id, client, test_inputs, agents_metadata)
+    stats = run_tests_for_agent(agent_id, client, test_inputs, index_enabled_agents(agents_metadata))
     await push_to_prometheus(stats)
     logger.info(f"Completed test for agent {agent_id}")
 
@@ -1,34 +1,159 @@
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
-from eth_defi.aave_v3.reserve import AaveContractsNotConfigured, fetch_reserve_data, get_helper_contracts
-from web3 import Web3
+import aiohttp
+import orjson
+from eth_defi.abi import get_abi_by_filename
+from web3 import AsyncHTTPProvider, AsyncWeb3
+from web3._utils.abi import named_tree
+from web3.middleware import async_simple_cache_middleware
 
+from decorators import with_cache, with_retry
 from mesh.mesh_agent import MeshAgent
 
 logger = logging.getLogger(__name__)
 
+# Failures worth retrying against a public RPC: dropped connections, timeouts and HTTP errors (4xx other than 429
+# are still raised immediately). Contract reverts and decoding errors are deterministic and fail on the first attempt.
+RPC_RETRY_ON = (aiohttp.ClientError, asyncio.TimeoutError)
+
+# Public RPC endpoints per chain, tried in order of measured latency and failed over on error
+RPC_URLS: Dict[int, List[str]] = {
+    1: ["https://rpc.ankr.com/eth", "https://eth.llamarpc.com", "https://ethereum-rpc.publicnode.com"],
+    137: ["https://polygon-rpc.com", "https://polygon-bor-rpc.publicnode.com"],
+    43114: ["https://api.avax.network/ext/bc/C/rpc", "https://avalanche-c-chain-rpc.publicnode.com"],
+    42161: ["https://arb1.arbitrum.io/rpc", "https://arbitrum-one-rpc.publicnode.com"],
+}
+# Weight of the newest sample in an endpoint's moving-average latency, and the latency charged for a failed call
+RPC_LATENCY_ALPHA = 0.3
+RPC_FAILURE_PENALTY = 10.0
+# Seconds an Ethereum fetch may run before Polygon is raced against it, when the caller allows the substitution
+ETHEREUM_HEDGE_DELAY = 1.0
+
+# Largest integer JSON clients parsing numbers as doubles represent exactly
+_MAX_SAFE_INT = 2**53 - 1
+# AggregatedReserveData fields that can exceed 2**53 (ray-scaled rates and indexes, token amounts in wei) and are
+# always returned as strings so JSON clients don't lose precision; other ints are stringified only when that large
+_LARGE_INT_FIELDS = frozenset(
+    {
+        "liquidityIndex",
+        "variableBorrowIndex",
+        "liquidityRate",
+        "variableBorrowRate",
+        "stableBorrowRate",
+        "averageStableRate",
+        "variableRateSlope1",
+        "variableRateSlope2",
+        "stableRateSlope1",
+        "stableRateSlope2",
+        "baseStableBorrowRate",
+        "baseVariableBorrowRate",
+        "optimalUsageRatio",
+        "availableLiquidity",
+        "totalPrincipalStableDebt",
+        "totalScaledVariableDebt",
+        "accruedToTreasury",
+        "unbacked",
+    }
+)
+
+# Aave v3 contracts needed to read reserve data, see https://docs.aave.com/developers/deployed-contracts/v3-mainnet
+AAVE_V3_ADDRESSES = {
+    1: {
+        "PoolAddressProvider": "0x2f39d218133AFaB8F2B819B1066c7E434Ad94E9e",
+        "UiPoolDataProviderV3": "0x91c0eA31b49B69Ea18607702c5d9aC360bf3dE7d",
+    },
+    137: {
+        "PoolAddressProvider": "0xa97684ead0e402dC232d5A977953DF7ECBaB3CDb",
+        "UiPoolDataProviderV3": "0xC69728f11E9E6127733751c8410432913123acf1",
+    },
+    43114: {
+        "PoolAddressProvider": "0xa97684ead0e402dC232d5A977953DF7ECBaB3CDb",
+        "UiPoolDataProviderV3": "0xF71DBe0FAEF1473ffC607d4c555dfF0aEaDb878d",
+    },
+    42161: {
+        "PoolAddressProvider": "0xa97684ead0e402dC232d5A977953DF7ECBaB3CDb",
+        "UiPoolDataProviderV3": "0x145dE30c929a065582da84Cf96F88460dB9745A7",
+    },
+}
+
+# Block identifiers accepted by eth_call: hex block numbers (up to 64 bits), 32-byte block hashes and named tags
+_HEX_BLOCK_NUMBER = re.compile(r"0x[0-9a-fA-F]{1,16}")
+_BLOCK_HASH = re.compile(r"0x[0-9a-fA-F]{64}")
+_BLOCK_TAGS = frozenset({"latest", "earliest", "pending", "safe", "finalized"})
+
+# Built once at import and shared by every agent instance, treat as read-only
+_METADATA = {
+    "name": "Aave Agent",
+    "version": "1.0.0",
+    "author": "Heurist team",
+    "author_address": "0x7d9d1821d15B9e0b8Ab98A058361233E255E405D",
+    "description": "This agent can report the status of Aave v3 protocols deployed on Ethereum, Polygon, Avalanche, and Arbitrum with details on liquidity, borrowing rates, and more",
+    "external_apis": ["Aave"],
+    "tags": ["DeFi"],
+    "image_url": "https://raw.githubusercontent.com/heurist-network/heurist-agent-framework/refs/heads/main/mesh/images/Aave.png",
+    "examples": [
+        "What is the current borrow rate for USDC on Polygon?",
+        "Show me all assets on Ethereum with their lending and borrowing rates",
+        "Available liquidity for ETH on Arbitrum",
+    ],
+}
+
+_TOOL_SCHEMAS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_aave_reserves",
+            "description": "Get Aave v3 reserve data including liquidity, rates, and asset information",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "chain_id": {
+                        "type": "number",
+                        "description": "Blockchain network ID (137=Polygon, 1=Ethereum, 43114=Avalanche C-Chain, 42161=Arbitrum One.)",
+                        "enum": [1, 137, 43114, 42161],
+                    },
+                    "block_identifier": {
+                        "type": "string",
+                        "description": "Optional block number or hash for historical data",
+                    },
+                    "asset_filter": {
+                        "type": "string",
+                        "description": "Optional filter to get data for a specific asset symbol (e.g., 'USDC')",
+                    },
+                    "allow_polygon_fallback": {
+                        "type": "boolean",
+                        "description": "Whether Ethereum requests may be answered with Polygon data when Ethereum RPCs are slow or failing",
+                    },
+                },
+                "required": ["chain_id"],
+            },
+        },
+    }
+]
+
+
+class OrjsonHTTPProvider(AsyncHTTPProvider):
+    """AsyncHTTPProvider decoding responses with orjson, which parses the multi-KB getReservesData payload faster"""
+
+    def decode_rpc_response(self, raw_response: bytes) -> Dict[str, Any]:
+        return orjson.loads(raw_response)
+
 
 class AaveAgent(MeshAgent):
     def __init__(self):
         super().__init__()
-        self.metadata.update(
-            {
-                "name": "Aave Agent",
-                "version": "1.0.0",
-                "author": "Heurist team",
-                "author_address": "0x7d9d1821d15B9e0b8Ab98A058361233E255E405D",
-                "description": "This agent can report the status of Aave v3 protocols deployed on Ethereum, Polygon, Avalanche, and Arbitrum with details on liquidity, borrowing rates, and more",
-                "external_apis": ["Aave"],
-                "tags": ["DeFi"],
-                "image_url": "https://raw.githubusercontent.com/heurist-network/heurist-agent-framework/refs/heads/main/mesh/images/Aave.png",
-                "examples": [
-                    "What is the current borrow rate for USDC on Polygon?",
-                    "Show me all assets on Ethereum with their lending and borrowing rates",
-                    "Available liquidity for ETH on Arbitrum",
-                ],
-            }
-        )
+        self.metadata.update(_METADATA)
+        # one Web3 connection per chain and RPC endpoint, reused across calls
+        self._w3_cache: Dict[Tuple[int, str], AsyncWeb3] = {}
+        # UiPoolDataProvider contract and pool addresses provider per connection
+        self._helpers: Dict[Tuple[int, str], tuple] = {}
+        # in-process moving-average latency in seconds per (chain, RPC endpoint)
+        self._rpc_latency: Dict[Tuple[int, str], float] = {}
 
     def get_system_prompt(self) -> str:
         return """You are a helpful assistant that can access external tools to provide Aave v3 reserve data.
@@ -41,83 +166,156 @@ class AaveAgent(MeshAgent):
         Output in CLEAN text format with no markdown or other formatting."""
 
     def get_tool_schemas(self) -> List[Dict]:
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_aave_reserves",
-                    "description": "Get Aave v3 reserve data including liquidity, rates, and asset information",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "chain_id": {
-                                "type": "number",
-                                "description": "Blockchain network ID (137=Polygon, 1=Ethereum, 43114=Avalanche C-Chain, 42161=Arbitrum One.)",
-                                "enum": [1, 137, 43114, 42161],
-                            },
-                            "block_identifier": {
-                                "type": "string",
-                                "description": "Optional block number or hash for historical data",
-                            },
-                            "asset_filter": {
-                                "type": "string",
-                                "description": "Optional filter to get data for a specific asset symbol (e.g., 'USDC')",
-                            },
-                        },
-                        "required": ["chain_id"],
-                    },
-                },
-            }
-        ]
+        return _TOOL_SCHEMAS
 
     # ------------------------------------------------------------------------
     #                      AAVE API-SPECIFIC METHODS
     # ------------------------------------------------------------------------
-    def _initialize_web3(self, chain_id: int = 137) -> Web3:
-        """Initialize Web3 connection for a supported chain."""
-        try:
-            chain_id = int(chain_id)
-        except ValueError:
-            raise ValueError(f"Invalid chain ID format: {chain_id}")
-
-        rpc_urls = {
-            1: "https://rpc.ankr.com/eth",
-            137: "https://polygon-rpc.com",
-            43114: "https://api.avax.network/ext/bc/C/rpc",
-            42161: "https://arb1.arbitrum.io/rpc",
-        }
-
-        rpc_url = rpc_urls.get(chain_id)
-        if not rpc_url:
+    def _rank_rpc_urls(self, chain_id: int) -> List[str]:
+        """Order a chain's RPC endpoints for one call, randomly weighted towards the lowest average latency."""
+        urls = RPC_URLS.get(chain_id)
+        if not urls:
             raise ValueError(f"Unsupported chain ID: {chain_id}")
 
-        w3 = Web3(
-            Web3.HTTPProvider(
-                rpc_url,
-                request_kwargs={
-                    "timeout": 60,
-                    "headers": {
-                        "Content-Type": "application/json",
-                        "User-Agent": "AaveReserveAgent/1.0.0",
-                    },
+        # endpoints not measured yet are weighted like the fastest one so they get tried too
+        measured = [self._rpc_latency[(chain_id, url)] for url in urls if (chain_id, url) in self._rpc_latency]
+        default_latency = min(measured) if measured else 1.0
+
+        remaining = list(urls)
+        ranked = []
+        while remaining:
+            weights = [1 / self._rpc_latency.get((chain_id, url), default_latency) for url in remaining]
+            url = random.choices(remaining, weights=weights)[0]
+            remaining.remove(url)
+            ranked.append(url)
+        return ranked
+
+    def _record_rpc_latency(self, chain_id: int, rpc_url: str, seconds: float) -> None:
+        previous = self._rpc_latency.get((chain_id, rpc_url))
+        if previous is not None:
+            seconds = RPC_LATENCY_ALPHA * seconds + (1 - RPC_LATENCY_ALPHA) * previous
+        self._rpc_latency[(chain_id, rpc_url)] = seconds
+
+    async def _initialize_web3(self, chain_id: int, rpc_url: str) -> AsyncWeb3:
+        """Get the Web3 connection to an RPC endpoint, created once and sending over the agent's HTTP session."""
+        if (chain_id, rpc_url) in self._w3_cache:
+            return self._w3_cache[(chain_id, rpc_url)]
+
+        provider = OrjsonHTTPProvider(
+            rpc_url,
+            request_kwargs={
+                "timeout": aiohttp.ClientTimeout(total=60),
+                "headers": {
+                    "Content-Type": "application/json",
+                    "User-Agent": "AaveReserveAgent/1.0.0",
                 },
-            )
+            },
         )
+        if not self.session:
+            self.session = aiohttp.ClientSession()
+        await provider.cache_async_session(self.session)
 
-        if not w3.is_connected():
-            raise ConnectionError(f"Web3 failed to connect for chain ID {chain_id}")
-
+        w3 = AsyncWeb3(provider)
+        # web3 validates every eth_call against eth_chainId; caching it per connection leaves one round trip per fetch
+        w3.middleware_onion.add(async_simple_cache_middleware)
+        self._w3_cache[(chain_id, rpc_url)] = w3
         return w3
 
-    def _initialize_aave_contracts(self, web3: Web3):
-        """Initialize Aave contracts for a given Web3 instance."""
+    def _initialize_aave_contracts(self, web3: AsyncWeb3, chain_id: int, rpc_url: str):
+        """Initialize the Aave UiPoolDataProvider contract for a chain, once per connection."""
+        if (chain_id, rpc_url) in self._helpers:
+            return self._helpers[(chain_id, rpc_url)]
+
+        addresses = AAVE_V3_ADDRESSES.get(chain_id)
+        if not addresses:
+            raise RuntimeError(f"Aave v3 not supported on chain ID {chain_id}")
+
+        ui_pool_data_provider = web3.eth.contract(
+            address=AsyncWeb3.to_checksum_address(addresses["UiPoolDataProviderV3"]),
+            abi=get_abi_by_filename("aave_v3/UiPoolDataProviderV3.json")["abi"],
+        )
+        helpers = (ui_pool_data_provider, AsyncWeb3.to_checksum_address(addresses["PoolAddressProvider"]))
+        self._helpers[(chain_id, rpc_url)] = helpers
+        return helpers
+
+    @with_retry(max_retries=3, delay=0.1, retry_on=RPC_RETRY_ON, max_delay=2.0, full_jitter=True)
+    async def _fetch_reserve_data(self, helper_contracts, block_identifier=None):
+        """Fetch all reserves and the base currency info in one getReservesData call."""
+        # UiPoolDataProvider aggregates every reserve on-chain, so there are no per-reserve calls to issue
+        ui_pool_data_provider, pool_addresses_provider = helper_contracts
+        func = ui_pool_data_provider.functions.getReservesData(pool_addresses_provider)
+        aggregated_reserve_data, base_currency_info = await func.call(block_identifier=block_identifier)
+
+        # Decode the anonymous tuples to named struct fields
+        outputs = func.abi["outputs"]
+        reserves = [named_tree(outputs[0]["components"], reserve) for reserve in aggregated_reserve_data]
+        return reserves, named_tree(outputs[1]["components"], base_currency_info)
+
+    async def _fetch_reserve_data_with_failover(self, chain_id: int, rpc_urls: List[str], block_identifier=None):
+        """Fetch reserve data from the first of rpc_urls that answers, updating each endpoint's latency."""
+        last_error = None
+        for rpc_url in rpc_urls:
+            web3 = await self._initialize_web3(chain_id, rpc_url)
+            helper_contracts = self._initialize_aave_contracts(web3, chain_id, rpc_url)
+            start = time.perf_counter()
+            try:
+                result = await self._fetch_reserve_data(helper_contracts, block_identifier=block_identifier)
+            except Exception as e:
+                logger.warning("RPC endpoint %s failed for chain %s: %s", rpc_url, chain_id, e)
+                self._record_rpc_latency(chain_id, rpc_url, RPC_FAILURE_PENALTY)
+                last_error = e
+                continue
+            self._record_rpc_latency(chain_id, rpc_url, time.perf_counter() - start)
+            return result
+        raise last_error
+
+    async def _fetch_reserve_data_hedged(self, rpc_urls: List[str]) -> Tuple[int, tuple]:
+        """Fetch Ethereum reserve data, also firing a Polygon fetch if Ethereum hasn't answered after a delay.
+
+        Returns the chain ID that answered first along with its data; the other fetch is cancelled.
+        """
+
+        async def polygon_after_delay():
+            await asyncio.sleep(ETHEREUM_HEDGE_DELAY)
+            logger.info("Ethereum reserves still pending after %ss, hedging with Polygon", ETHEREUM_HEDGE_DELAY)
+            return await self._fetch_reserve_data_with_failover(137, self._rank_rpc_urls(137))
+
+        ethereum = asyncio.create_task(self._fetch_reserve_data_with_failover(1, rpc_urls))
+        polygon = asyncio.create_task(polygon_after_delay())
+        pending = {ethereum, polygon}
         try:
-            return get_helper_contracts(web3)
-        except AaveContractsNotConfigured as e:
-            raise RuntimeError(f"Aave v3 not supported on chain ID {web3.eth.chain_id}") from e
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return (1 if task is ethereum else 137), task.result()
+            # both failed, report the Ethereum error
+            raise ethereum.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    def _parse_block_identifier(block_identifier) -> Optional[Any]:
+        """Coerce decimal and hex block numbers to int, keep block hashes and tags, and reject anything else."""
+        if block_identifier is None or isinstance(block_identifier, int):
+            return block_identifier
+        block_identifier = block_identifier.strip()
+        if not block_identifier:
+            return None
+        if block_identifier.isdigit():
+            return int(block_identifier)
+        if _HEX_BLOCK_NUMBER.fullmatch(block_identifier):
+            return int(block_identifier, 16)
+        if _BLOCK_HASH.fullmatch(block_identifier) or block_identifier in _BLOCK_TAGS:
+            return block_identifier
+        raise ValueError(f"Invalid block identifier: {block_identifier}")
 
     def _process_reserve(self, reserve: Dict) -> Dict:
-        result = {k: str(v) if isinstance(v, int) and abs(v) > 2**53 - 1 else v for k, v in reserve.items()}
+        result = {
+            k: str(v) if k in _LARGE_INT_FIELDS or (type(v) is int and abs(v) > _MAX_SAFE_INT) else v
+            for k, v in reserve.items()
+        }
 
         if "variableBorrowRate" in reserve:
             result["variableBorrowAPR"] = round(float(reserve["variableBorrowRate"]) / 1e25, 2)
@@ -127,22 +325,46 @@ class AaveAgent(MeshAgent):
 
         return result
 
+    def _process_reserves(self, raw_reserves: List[Dict], asset_filter: str = None) -> Dict:
+        """Process the reserves matching asset_filter, keyed by lowercase underlying asset address."""
+        if not asset_filter:
+            return {reserve["underlyingAsset"].lower(): self._process_reserve(reserve) for reserve in raw_reserves}
+
+        symbol = asset_filter.upper()
+        return {
+            reserve["underlyingAsset"].lower(): self._process_reserve(reserve)
+            for reserve in raw_reserves
+            if reserve.get("symbol", "").upper() == symbol
+        }
+
+    @with_cache(ttl_seconds=300, error_ttl_seconds=30)
     async def get_aave_reserves(
-        self, chain_id: int = 137, block_identifier: str = None, asset_filter: str = None
+        self,
+        chain_id: int = 137,
+        block_identifier: str = None,
+        asset_filter: str = None,
+        allow_polygon_fallback: bool = False,
     ) -> Dict:
-        """Fetch and process Aave reserve data."""
+        """Fetch and process Aave reserve data, optionally racing Polygon against a slow Ethereum fetch."""
         # Could use self._api_request() from base class instead of implementing web3 calls
         try:
-            block_id = int(block_identifier) if block_identifier and block_identifier.isdigit() else block_identifier
-            web3 = self._initialize_web3(chain_id)
-            if chain_id == 1:
-                web3.eth.default_block_identifier = "latest"
-                logger.info("Using latest block for Ethereum mainnet")
-
-            helper_contracts = self._initialize_aave_contracts(web3)
+            block_id = self._parse_block_identifier(block_identifier)
+            try:
+                chain = int(chain_id)
+            except ValueError:
+                raise ValueError(f"Invalid chain ID format: {chain_id}")
+            rpc_urls = self._rank_rpc_urls(chain)
 
             try:
-                raw_reserves, base_currency = fetch_reserve_data(helper_contracts, block_identifier=block_id)
+                # a block number or hash only means something on its own chain, so historical reads are never hedged
+                if chain == 1 and allow_polygon_fallback and block_id is None:
+                    answered_chain, (raw_reserves, base_currency) = await self._fetch_reserve_data_hedged(rpc_urls)
+                    if answered_chain != chain:
+                        chain_id = answered_chain
+                else:
+                    raw_reserves, base_currency = await self._fetch_reserve_data_with_failover(
+                        chain, rpc_urls, block_identifier=block_id
+                    )
             except Exception as e:
                 logger.error(f"Contract fetch error: {e}")
                 if chain_id == 1:
@@ -150,23 +372,15 @@ class AaveAgent(MeshAgent):
                     return {"error": "Ethereum data unavailable. Try Polygon instead."}
                 raise
 
-            processed_reserves = {
-                reserve["underlyingAsset"].lower(): self._process_reserve(reserve)
-                for reserve in raw_reserves
-                if not asset_filter or reserve.get("symbol", "").upper() == asset_filter.upper()
-            }
+            # converting every field of every reserve is CPU work, keep it off the event loop
+            processed_reserves = await asyncio.to_thread(self._process_reserves, raw_reserves, asset_filter)
 
             return {
                 "reserves": processed_reserves,
                 "base_currency": {
-                    k: str(v)
-                    for k, v in base_currency.items()
-                    if k
-                    in {
-                        "marketReferenceCurrencyUnit",
-                        "marketReferenceCurrencyPriceInUsd",
-                        "networkBaseTokenPriceInUsd",
-                    }
+                    "marketReferenceCurrencyUnit": str(base_currency["marketReferenceCurrencyUnit"]),
+                    "marketReferenceCurrencyPriceInUsd": str(base_currency["marketReferenceCurrencyPriceInUsd"]),
+                    "networkBaseTokenPriceInUsd": str(base_currency["networkBaseTokenPriceInUsd"]),
                 },
                 "chain_id": chain_id,
                 "total_reserves": len(processed_reserves),
@@ -189,16 +403,17 @@ class AaveAgent(MeshAgent):
         chain_id = function_args.get("chain_id", 137)
         block_identifier = function_args.get("block_identifier")
         asset_filter = function_args.get("asset_filter")
+        allow_polygon_fallback = function_args.get("allow_polygon_fallback", False)
 
         logger.info(f"Fetching Aave reserves (chain_id={chain_id})")
-        result = await self.get_aave_reserves(chain_id, block_identifier, asset_filter)
+        result = await self.get_aave_reserves(chain_id, block_identifier, asset_filter, allow_polygon_fallback)
 
         if errors := self._handle_error(result):
             return errors
 
         return {
             "reserve_data": {
-                "chain_id": chain_id,
+                "chain_id": result["chain_id"],
                 "reserves": result["reserves"],
                 "base_currency": result["base_currency"],
                 "total_reserves": result["total_reserves"],
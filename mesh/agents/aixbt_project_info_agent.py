@@ -1,61 +1,125 @@
+import asyncio
 import logging
 import os
-import ssl
 from typing import Any, Dict, List, Optional
 
 import aiohttp
-from dotenv import load_dotenv
+import orjson
 
 from decorators import with_cache, with_retry
-from mesh.mesh_agent import MeshAgent
+from mesh.mesh_agent import MeshAgent, get_shared_session
 
 logger = logging.getLogger(__name__)
-load_dotenv()
+
+_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3)
+# Transient failures worth retrying with backoff; other error statuses are returned right away
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_RETRY_ON = (aiohttp.ClientError, asyncio.TimeoutError)
+
+# search_projects query parameters, in signature order, with the normalization applied to each when set.
+# Equivalent spellings the API treats the same (case-insensitive ticker and chain, handle with or without @, limits
+# above the cap) normalize to the same params and so share a cache entry. Name is a regex and is left as is.
+_SEARCH_PARAMS = (
+    ("limit", lambda limit: min(limit, 50)),
+    ("name", None),
+    ("ticker", str.lower),
+    ("xHandle", lambda handle: handle.replace("@", "")),
+    ("minScore", None),
+    ("chain", str.lower),
+)
+
+
+# Built once at import and shared by every agent instance, treat as read-only
+_METADATA = {
+    "name": "AIXBT Project Info Agent",
+    "version": "1.0.0",
+    "author": "Heurist team",
+    "author_address": "0x7d9d1821d15B9e0b8Ab98A058361233E255E405D",
+    "description": "This agent can retrieve trending project information including fundamental analysis, social activity, and recent developments using the aixbt API",
+    "external_apis": ["aixbt"],
+    "tags": ["Project Analysis"],
+    "recommended": True,
+    "image_url": "https://raw.githubusercontent.com/heurist-network/heurist-agent-framework/refs/heads/main/mesh/images/Aixbt.png",
+    "examples": [
+        "Tell me about Heurist",
+        "What are the latest developments for Ethereum?",
+        "Trending projects in the crypto space",
+    ],
+    "credits": 0,
+}
+
+_TOOL_SCHEMAS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "search_projects",
+            "description": "Search for cryptocurrency projects with comprehensive details including fundamental analysis, market performance, social activity, and recent developments. Return detailed insights on project descriptions, token contracts across multiple chains, Twitter handles, community metrics, price movements, and chronological timelines of notable updates. Perfect for discovering trending projects, researching specific tokens by name/ticker/Twitter handle, or filtering projects by blockchain network and popularity scores.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of projects to return (max 50).",
+                        "default": 10,
+                    },
+                    "name": {
+                        "type": "string",
+                        "description": "Filter projects by name (case-insensitive regex match). Effective for finding specific projects or related projects sharing similar naming conventions.",
+                    },
+                    "ticker": {
+                        "type": "string",
+                        "description": "Filter projects by ticker symbol (case-insensitive match). Useful when you know the exact trading symbol of a token.",
+                    },
+                    "xHandle": {
+                        "type": "string",
+                        "description": "Filter projects by X/Twitter handle. Ideal for finding projects from their social media identities, with or without the @ symbol.",
+                    },
+                    "minScore": {
+                        "type": "number",
+                        "description": "Minimum score threshold for filtering projects based on social trends and market activity. Use 0 if a project name/ticker/handle is specified. For trending projects, use 0.1-0.3. For the most popular projects only, use 0.4-0.5. Higher scores indicate more significant current market attention.",
+                    },
+                    "chain": {
+                        "type": "string",
+                        "description": "Filter projects by blockchain (e.g., 'ethereum', 'solana', 'base'). Returns projects with tokens deployed on the specified chain, useful for ecosystem-specific research.",
+                    },
+                },
+                "required": [],
+            },
+        },
+    },
+]
+
+
+def _search_ttl(arguments: dict) -> int:
+    """Lookups of a specific project change slowly, broad trending scans go stale sooner"""
+    params = arguments["params"]
+    if params.get("name") or params.get("ticker") or params.get("xHandle"):
+        return 1800
+    return 600
 
 
 class AIXBTProjectInfoAgent(MeshAgent):
     def __init__(self):
         super().__init__()
         self.session = None
+        # .env has already been loaded once by mesh.mesh_agent on import
         self.api_key = os.getenv("AIXBT_API_KEY")
         if not self.api_key:
             raise ValueError("AIXBT_API_KEY environment variable is required")
 
         self.base_url = "https://api.aixbt.tech/v1"
+        self._projects_url = f"{self.base_url}/projects"
         self.headers = {
             "accept": "*/*",
             "Authorization": f"Bearer {self.api_key}",
         }
 
-        self.metadata.update(
-            {
-                "name": "AIXBT Project Info Agent",
-                "version": "1.0.0",
-                "author": "Heurist team",
-                "author_address": "0x7d9d1821d15B9e0b8Ab98A058361233E255E405D",
-                "description": "This agent can retrieve trending project information including fundamental analysis, social activity, and recent developments using the aixbt API",
-                "external_apis": ["aixbt"],
-                "tags": ["Project Analysis"],
-                "recommended": True,
-                "image_url": "https://raw.githubusercontent.com/heurist-network/heurist-agent-framework/refs/heads/main/mesh/images/Aixbt.png",
-                "examples": [
-                    "Tell me about Heurist",
-                    "What are the latest developments for Ethereum?",
-                    "Trending projects in the crypto space",
-                ],
-                "credits": 0,
-            }
-        )
+        self.metadata.update(_METADATA)
 
     # Keep the original session management to maintain SSL behavior
     async def __aenter__(self):
-        # Create session with SSL verification disabled
-        # This is needed specifically for the aixbt API due to certificate issues
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-
-        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context))
+        # SSL verification is disabled for the aixbt API due to certificate issues
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False))
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -85,52 +149,11 @@ class AIXBTProjectInfoAgent(MeshAgent):
         non-crypto projects, explain the limitations of this service."""
 
     def get_tool_schemas(self) -> List[Dict]:
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": "search_projects",
-                    "description": "Search for cryptocurrency projects with comprehensive details including fundamental analysis, market performance, social activity, and recent developments. Return detailed insights on project descriptions, token contracts across multiple chains, Twitter handles, community metrics, price movements, and chronological timelines of notable updates. Perfect for discovering trending projects, researching specific tokens by name/ticker/Twitter handle, or filtering projects by blockchain network and popularity scores.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "limit": {
-                                "type": "integer",
-                                "description": "Number of projects to return (max 50).",
-                                "default": 10,
-                            },
-                            "name": {
-                                "type": "string",
-                                "description": "Filter projects by name (case-insensitive regex match). Effective for finding specific projects or related projects sharing similar naming conventions.",
-                            },
-                            "ticker": {
-                                "type": "string",
-                                "description": "Filter projects by ticker symbol (case-insensitive match). Useful when you know the exact trading symbol of a token.",
-                            },
-                            "xHandle": {
-                                "type": "string",
-                                "description": "Filter projects by X/Twitter handle. Ideal for finding projects from their social media identities, with or without the @ symbol.",
-                            },
-                            "minScore": {
-                                "type": "number",
-                                "description": "Minimum score threshold for filtering projects based on social trends and market activity. Use 0 if a project name/ticker/handle is specified. For trending projects, use 0.1-0.3. For the most popular projects only, use 0.4-0.5. Higher scores indicate more significant current market attention.",
-                            },
-                            "chain": {
-                                "type": "string",
-                                "description": "Filter projects by blockchain (e.g., 'ethereum', 'solana', 'base'). Returns projects with tokens deployed on the specified chain, useful for ecosystem-specific research.",
-                            },
-                        },
-                        "required": [],
-                    },
-                },
-            },
-        ]
+        return _TOOL_SCHEMAS
 
     # ------------------------------------------------------------------------
     #                      AIXBT API-SPECIFIC METHODS
     # ------------------------------------------------------------------------
-    @with_cache(ttl_seconds=3600)
-    @with_retry(max_retries=3)
     async def search_projects(
         self,
         limit: Optional[int] = 10,
@@ -140,64 +163,58 @@ class AIXBTProjectInfoAgent(MeshAgent):
         minScore: Optional[float] = None,
         chain: Optional[str] = None,
     ) -> Dict[str, Any]:
-        should_close = False
-        if not self.session:
-            # Create a session with SSL verification disabled if needed
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-
-            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context))
-            should_close = True
-
+        values = (limit, name, ticker, xHandle, minScore, chain)
+        params = {
+            key: transform(value) if transform else value
+            for (key, transform), value in zip(_SEARCH_PARAMS, values)
+            # normalized params are also left out when empty, e.g. limit=0 or chain=""
+            if value is not None and (value or transform is None)
+        }
         try:
-            url = f"{self.base_url}/projects"
-
-            params = {
-                "limit": min(limit, 50) if limit else None,
-                "name": name,
-                "ticker": ticker,
-                "xHandle": xHandle.replace("@", "") if xHandle else None,
-                "minScore": minScore,
-                "chain": chain.lower() if chain else None,
-            }
-            params = {k: v for k, v in params.items() if v is not None}
-            logger.info(f"Searching projects with params: {params}")
-
-            # Keep the original request implementation for consistency
-            async with self.session.get(url, headers=self.headers, params=params) as response:
-                text = await response.text()
-                if response.status != 200:
-                    logger.error(f"API Error {response.status}: {text[:200]}")
-                    return {"error": f"API Error {response.status}: {text[:200]}", "projects": []}
-
-                try:
-                    data = await response.json()
-                except Exception as e:
-                    logger.error(f"JSON decode error: {e}")
-                    return {"error": f"Failed to parse API response: {e}", "projects": []}
+            return await self._search_projects(params)
+        except Exception as e:
+            logger.error("Exception during project search: %s", e)
+            return {"error": f"Failed to search projects: {e}", "projects": []}
 
-                if isinstance(data, list):
-                    return {"projects": data}
+    @with_cache(ttl_for=_search_ttl, stale_ttl_seconds=7200)
+    @with_retry(max_retries=3, delay=0.2, retry_on=_RETRY_ON, full_jitter=True)
+    async def _search_projects(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Query /projects with normalized params, cached by them. Raises on transient failures so they're retried."""
+        # outside `async with`, reuse the pooled session instead of opening a connection per call
+        session = self.session or await get_shared_session()
+        logger.info("Searching projects with params: %s", params)
+
+        # Keep the original request implementation for consistency
+        # ssl=False skips certificate verification, which the aixbt API needs
+        async with session.get(
+            self._projects_url, headers=self.headers, params=params, ssl=False, timeout=_REQUEST_TIMEOUT
+        ) as response:
+            if response.status in _RETRY_STATUSES:
+                response.raise_for_status()
+            if response.status != 200:
+                text = await response.text()
+                logger.error("API Error %s: %s", response.status, text[:200])
+                return {"error": f"API Error {response.status}: {text[:200]}", "projects": []}
 
-                if isinstance(data, dict):
-                    if data.get("status") == 200 and "data" in data:
-                        return {"projects": data["data"]}
-                    if "projects" in data:
-                        return data
-                    return {"error": data.get("error", "Unexpected API response"), "projects": []}
+            try:
+                # parse the raw bytes once, without decoding them to str first
+                data = orjson.loads(await response.read())
+            except Exception as e:
+                logger.error("JSON decode error: %s", e)
+                return {"error": f"Failed to parse API response: {e}", "projects": []}
 
-                logger.warning(f"Unexpected format: {data}")
-                return {"projects": []}
+            if isinstance(data, list):
+                return {"projects": data}
 
-        except Exception as e:
-            logger.error(f"Exception during project search: {e}")
-            return {"error": f"Failed to search projects: {e}", "projects": []}
+            if isinstance(data, dict):
+                if data.get("status") == 200 and "data" in data:
+                    return {"projects": data["data"]}
+                if "projects" in data:
+                    return data
+                return {"error": data.get("error", "Unexpected API response"), "projects": []}
 
-        finally:
-            if should_close and self.session:
-                await self.session.close()
-                self.session = None
+            logger.warning("Unexpected format: %s", data)
+            return {"projects": []}
 
     # ------------------------------------------------------------------------
     #                      TOOL HANDLING LOGIC
@@ -219,7 +236,7 @@ class AIXBTProjectInfoAgent(MeshAgent):
         )
 
         if result.get("error"):
-            logger.warning(f"AIXBT error: {result['error']}")
+            logger.warning("AIXBT error: %s", result["error"])
             return {"error": result["error"], "data": {"projects": []}}
 
         return {"data": result}
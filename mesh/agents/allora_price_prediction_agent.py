@@ -1,8 +1,65 @@
+import asyncio
 import os
 from typing import Any, Dict, List, Optional
 
+import aiohttp
+import orjson
+
 from decorators import monitor_execution, with_cache, with_retry
-from mesh.mesh_agent import MeshAgent
+from mesh.mesh_agent import MeshAgent, get_shared_session
+
+_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3)
+_PREDICTION_URL = "https://api.upshot.xyz/v2/allora/consumer/price/ethereum-11155111"
+# Rate limits, server errors and timeouts are retried; other 4xx responses fail on the first attempt
+_RETRY_ON = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+# Built once at import and shared by every agent instance, treat as read-only
+_METADATA = {
+    "name": "Allora Agent",
+    "version": "1.0.0",
+    "author": "Heurist team",
+    "author_address": "0x7d9d1821d15B9e0b8Ab98A058361233E255E405D",
+    "description": "This agent can predict the price of ETH/BTC with confidence intervals using Allora price prediction API",
+    "external_apis": ["Allora"],
+    "tags": ["Prediction"],
+    "image_url": "https://raw.githubusercontent.com/heurist-network/heurist-agent-framework/refs/heads/main/mesh/images/Allora.png",
+    "examples": [
+        "What is the price prediction for BTC in the next 5 minutes?",
+        "Price prediction for ETH in the next 8 hours",
+    ],
+}
+
+_TOOL_SCHEMAS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_allora_prediction",
+            "description": "Get price prediction for ETH or BTC with confidence intervals",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "token": {
+                        "type": "string",
+                        "description": "The cryptocurrency symbol (ETH or BTC)",
+                        "enum": ["ETH", "BTC"],
+                    },
+                    "timeframe": {
+                        "type": "string",
+                        "description": "Time period for prediction",
+                        "enum": ["5m", "8h"],
+                    },
+                },
+                "required": ["token", "timeframe"],
+            },
+        },
+    }
+]
+
+
+def _prediction_ttl(arguments: dict) -> int:
+    """8-hour predictions are updated far less often than 5-minute ones"""
+    return 1800 if arguments.get("timeframe") == "8h" else 300
 
 
 class AlloraPricePredictionAgent(MeshAgent):
@@ -16,23 +73,14 @@ class AlloraPricePredictionAgent(MeshAgent):
             "accept": "application/json",
             "x-api-key": self.api_key,
         }
+        # every supported token/timeframe pair, matching the tool schema enums
+        self._urls = {
+            (token, timeframe): f"{_PREDICTION_URL}/{token}/{timeframe}"
+            for token in ("ETH", "BTC")
+            for timeframe in ("5m", "8h")
+        }
 
-        self.metadata.update(
-            {
-                "name": "Allora Agent",
-                "version": "1.0.0",
-                "author": "Heurist team",
-                "author_address": "0x7d9d1821d15B9e0b8Ab98A058361233E255E405D",
-                "description": "This agent can predict the price of ETH/BTC with confidence intervals using Allora price prediction API",
-                "external_apis": ["Allora"],
-                "tags": ["Prediction"],
-                "image_url": "https://raw.githubusercontent.com/heurist-network/heurist-agent-framework/refs/heads/main/mesh/images/Allora.png",
-                "examples": [
-                    "What is the price prediction for BTC in the next 5 minutes?",
-                    "Price prediction for ETH in the next 8 hours",
-                ],
-            }
-        )
+        self.metadata.update(_METADATA)
 
     def get_system_prompt(self) -> str:
         return """You are a helpful assistant that can access external tools to provide Bitcoin and Ethereum price prediction data.
@@ -43,53 +91,24 @@ class AlloraPricePredictionAgent(MeshAgent):
         and output in CLEAN text format with no markdown or other formatting. Only return your response, no other text."""
 
     def get_tool_schemas(self) -> List[Dict]:
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_allora_prediction",
-                    "description": "Get price prediction for ETH or BTC with confidence intervals",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "token": {
-                                "type": "string",
-                                "description": "The cryptocurrency symbol (ETH or BTC)",
-                                "enum": ["ETH", "BTC"],
-                            },
-                            "timeframe": {
-                                "type": "string",
-                                "description": "Time period for prediction",
-                                "enum": ["5m", "8h"],
-                            },
-                        },
-                        "required": ["token", "timeframe"],
-                    },
-                },
-            }
-        ]
+        return _TOOL_SCHEMAS
 
     # ------------------------------------------------------------------------
     #                      ALLORA API-SPECIFIC METHODS
     # ------------------------------------------------------------------------
     @monitor_execution()
-    @with_cache(ttl_seconds=300)
-    @with_retry(max_retries=3)
+    @with_cache(ttl_for=_prediction_ttl, stale_ttl_seconds=60)
     async def get_allora_prediction(self, token: str, timeframe: str) -> Dict[str, Any]:
         """Fetch normalized price prediction data from Allora API."""
         if not token or not timeframe:
             return {"error": "Both 'token' and 'timeframe' are required"}
 
-        url = f"https://api.upshot.xyz/v2/allora/consumer/price/ethereum-11155111/{token.upper()}/{timeframe}"
+        url = self._urls.get((token.upper(), timeframe))
+        if url is None:
+            return {"error": f"Unsupported token or timeframe: {token} {timeframe}"}
 
         try:
-            response = await self._api_request(url=url, method="GET", headers=self.headers)
-
-            if "error" in response:
-                return {"error": response["error"]}
-
-            inference = response["data"]["inference_data"]
-
+            inference = await self._fetch_inference(url)
             return {
                 "prediction": float(inference["network_inference_normalized"]),
                 "confidence_intervals": inference["confidence_interval_percentiles_normalized"],
@@ -98,6 +117,15 @@ class AlloraPricePredictionAgent(MeshAgent):
         except Exception as e:
             return {"error": f"Allora API error: {e}"}
 
+    @with_retry(max_retries=3, delay=0.2, retry_on=_RETRY_ON, full_jitter=True)
+    async def _fetch_inference(self, url: str) -> Dict[str, Any]:
+        session = self.session or await get_shared_session()
+        # requested directly rather than through _api_request, whose cache would keep the whole response
+        # alive although only three fields of it are used
+        async with session.get(url, headers=self.headers, timeout=_REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            return orjson.loads(await response.read())["data"]["inference_data"]
+
     # ------------------------------------------------------------------------
     #                      TOOL HANDLING LOGIC
     # ------------------------------------------------------------------------
@@ -116,10 +144,5 @@ class AlloraPricePredictionAgent(MeshAgent):
         if errors := self._handle_error(result):
             return errors
 
-        return {
-            "prediction_data": {
-                "token": token,
-                "timeframe": timeframe,
-                **{k: result[k] for k in ("prediction", "confidence_intervals", "confidence_interval_values")},
-            }
-        }
+        # a successful result holds exactly the three prediction fields, merged without an intermediate copy
+        return {"prediction_data": {"token": token, "timeframe": timeframe, **result}}
@@ -103,6 +103,11 @@ class DeepResearchAgent(MeshAgent):
         )
         self.research_workflow = ResearchWorkflow(self.llm_provider, self.tools, search_clients=self.search_clients)
 
+    async def cleanup(self):
+        """Close the research workflow's pooled HTTP session along with the base resources"""
+        await self.research_workflow.aclose()
+        await super().cleanup()
+
     def get_system_prompt(self) -> str:
         return """You are an expert research analyst that processes can use a deep research tool to get a comprehensive report on a topic.
         Enhance the user query if needed to get a more accurate report. The deep research tool will return a report and a list of sources.
@@ -1,4 +1,5 @@
 import asyncio
+import atexit
 import json
 import os
 from abc import ABC, abstractmethod
@@ -6,6 +7,7 @@ from typing import Any, Dict, List, Optional
 
 import aiohttp
 import dotenv
+import orjson
 from loguru import logger
 
 from clients.mesh_client import MeshClient
@@ -23,6 +25,44 @@ HEURIST_API_KEY = os.getenv("HEURIST_API_KEY")
 # HEURIST_BASE_URL = os.getenv('OPENROUTER_BASE_URL') #os.getenv('HEURIST_BASE_URL')
 # HEURIST_API_KEY = os.getenv('OPENROUTER_API_KEY')
 
+# Pooled HTTP session shared by agents that aren't used as an async context manager
+_shared_session: Optional[aiohttp.ClientSession] = None
+_shared_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_shared_session() -> aiohttp.ClientSession:
+    """
+    Return the process-wide aiohttp session, created in the running loop on first use.
+    Keep-alive connections are reused across agents and calls instead of opening a new TCP/TLS connection per request.
+    """
+    global _shared_session, _shared_session_loop
+    loop = asyncio.get_running_loop()
+    # creating the session doesn't await, so concurrent callers can't both create one
+    if _shared_session is None or _shared_session.closed or _shared_session_loop is not loop:
+        _shared_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=75, enable_cleanup_closed=True
+            ),
+            timeout=aiohttp.ClientTimeout(total=30, connect=5),
+        )
+        _shared_session_loop = loop
+    return _shared_session
+
+
+async def close_shared_session():
+    """Close the shared session, e.g. on server shutdown"""
+    global _shared_session
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = None
+
+
+@atexit.register
+def _close_shared_session_at_exit():
+    # the event loop is usually gone by now, closing the connector releases the sockets synchronously
+    if _shared_session is not None and not _shared_session.closed:
+        _shared_session.connector.close()
+
 
 class MeshAgent(ABC):
     """Base class for all mesh agents"""
@@ -326,7 +366,13 @@ class MeshAgent(ABC):
     @with_retry(max_retries=3)
     @monitor_execution()
     async def _api_request(
-        self, url: str, method: str = "GET", headers: Dict = None, params: Dict = None, json_data: Dict = None
+        self,
+        url: str,
+        method: str = "GET",
+        headers: Dict = None,
+        params: Dict = None,
+        json_data: Dict = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
     ) -> Dict:
         """
         Generic API request method that can be used by child classes.
@@ -338,46 +384,40 @@ class MeshAgent(ABC):
             headers: HTTP headers
             params: URL parameters
             json_data: JSON payload for POST/PUT requests
+            timeout: Per-request timeout, defaults to the session's
 
         Returns:
             Dict with response data or error
         """
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-            should_close = True
-        else:
-            should_close = False
+        session = self.session or await get_shared_session()
+        request_kwargs = {"headers": headers, "params": params}
+        if timeout is not None:
+            request_kwargs["timeout"] = timeout
 
         try:
             if method.upper() == "GET":
-                async with self.session.get(url, headers=headers, params=params) as response:
+                async with session.get(url, **request_kwargs) as response:
                     if response.status == 429:
                         logger.warning(f"Rate limit exceeded for {url}. Retrying after 5 seconds...")
                         await asyncio.sleep(5)
-                        async with self.session.get(url, headers=headers, params=params) as retry_response:
+                        async with session.get(url, **request_kwargs) as retry_response:
                             retry_response.raise_for_status()
                             logger.info(f"Request to {url} succeeded after 429 retry")
-                            return await retry_response.json()
+                            return await retry_response.json(loads=orjson.loads)
                     response.raise_for_status()
-                    return await response.json()
+                    return await response.json(loads=orjson.loads)
             elif method.upper() == "POST":
-                async with self.session.post(url, headers=headers, params=params, json=json_data) as response:
+                async with session.post(url, json=json_data, **request_kwargs) as response:
                     if response.status == 429:
                         logger.warning(f"Rate limit exceeded for {url}. Retrying after 5 seconds...")
                         await asyncio.sleep(5)
-                        async with self.session.post(
-                            url, headers=headers, params=params, json=json_data
-                        ) as retry_response:
+                        async with session.post(url, json=json_data, **request_kwargs) as retry_response:
                             retry_response.raise_for_status()
                             logger.info(f"Request to {url} succeeded after 429 retry")
-                            return await retry_response.json()
+                            return await retry_response.json(loads=orjson.loads)
                     response.raise_for_status()
-                    return await response.json()
+                    return await response.json(loads=orjson.loads)
 
         except Exception as e:
             logger.error(f"API request error: {e}")
             return {"error": f"API request failed: {str(e)}"}
-        finally:
-            if should_close and self.session:
-                await self.session.close()
-                self.session = None
@@ -1,10 +1,11 @@
 import asyncio
+import itertools
 import logging
 import os
 import sys
 import time
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, Optional
 
@@ -20,6 +21,7 @@ load_dotenv()
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
+from mesh.mesh_agent import close_shared_session  # noqa: E402
 from mesh.mesh_manager import AgentLoader, Config  # noqa: E402
 
 
@@ -39,6 +41,7 @@ async def lifespan(app: FastAPI):
     yield
     logger.info("Application shutdown: cleaning up agent pool")
     await agent_pool.cleanup()
+    await close_shared_session()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -216,38 +219,39 @@ async def cache_debug():
         instance = data["instance"]
         agent_stats = {}
 
-        # Get all cache attributes
-        for attr_name in dir(instance.__class__):
-            if attr_name.startswith("_cache_") and not attr_name.startswith("_cache_ttl_"):
-                func_name = attr_name.replace("_cache_", "")
-                cache = getattr(instance.__class__, attr_name, {})
-                hits = getattr(instance.__class__, f"_cache_hits_{func_name}", 0)
-                misses = getattr(instance.__class__, f"_cache_misses_{func_name}", 0)
-                ttl_cache = getattr(instance.__class__, f"_cache_ttl_{func_name}", {})
-
-                # Calculate stats
-                total_calls = hits + misses
-                hit_ratio = (hits / total_calls * 100) if total_calls > 0 else 0
-
-                # Get expiration times for the first few keys
-                expirations = {}
-                for key in list(cache.keys())[:5]:
-                    if key in ttl_cache:
-                        expiration = ttl_cache[key]
-                        expirations[key] = {
-                            "expires_at": expiration.isoformat(),
-                            "seconds_left": (expiration - datetime.now()).total_seconds(),
-                        }
-
-                agent_stats[func_name] = {
-                    "items": len(cache),
-                    "hits": hits,
-                    "misses": misses,
-                    "hit_ratio": f"{hit_ratio:.1f}%",
-                    "first_few_keys": list(cache.keys())[:5],
-                    "expiration_info": expirations,
+        # Get all methods decorated with with_cache
+        for func_name in dir(instance.__class__):
+            method = getattr(instance.__class__, func_name, None)
+            if not hasattr(method, "cache_stats"):
+                continue
+            cache = method.cache
+            hits, misses = method.cache_stats
+
+            # Calculate stats
+            total_calls = hits + misses
+            hit_ratio = (hits / total_calls * 100) if total_calls > 0 else 0
+
+            # Get expiration times for the first few keys, entries store a monotonic expiry first
+            expirations = {}
+            now = time.monotonic()
+            # keys are raw digests, shown as hex
+            first_keys = list(itertools.islice(cache.keys(), 5))
+            for key in first_keys:
+                seconds_left = cache[key][0] - now
+                expirations[key.hex()] = {
+                    "expires_at": (datetime.now() + timedelta(seconds=seconds_left)).isoformat(),
+                    "seconds_left": seconds_left,
                 }
 
+            agent_stats[func_name] = {
+                "items": len(cache),
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": f"{hit_ratio:.1f}%",
+                "first_few_keys": [key.hex() for key in first_keys],
+                "expiration_info": expirations,
+            }
+
         stats[agent_id] = agent_stats
 
     return {
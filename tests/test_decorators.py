@@ -0,0 +1,88 @@
+import asyncio
+
+import decorators
+from decorators import _make_cache_key, with_cache
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    @with_cache(ttl_seconds=60, maxsize=3)
+    async def double(self, value: int) -> dict:
+        self.calls += 1
+        return {"value": value * 2}
+
+
+def test_with_cache_evicts_past_maxsize(monkeypatch):
+    # admit every result once the cache is full, so each new call has to evict an entry
+    monkeypatch.setattr(decorators.random, "random", lambda: 0.0)
+    counter = Counter()
+
+    async def run():
+        return [await counter.double(value) for value in range(6)]
+
+    results = asyncio.run(run())
+
+    assert results == [{"value": value * 2} for value in range(6)]
+    assert counter.calls == 6
+    assert len(Counter.double.cache) == 3
+
+
+def test_with_cache_serves_hits_after_eviction(monkeypatch):
+    monkeypatch.setattr(decorators.random, "random", lambda: 0.0)
+    counter = Counter()
+
+    async def run():
+        for value in range(6):
+            await counter.double(value)
+        # the most recently cached value survived eviction
+        return await counter.double(5)
+
+    assert asyncio.run(run()) == {"value": 10}
+    assert counter.calls == 6
+
+
+def test_make_cache_key_is_canonical():
+    first = "abc" * 10
+    second = "".join(["abc"] * 10)
+    assert first == second and first is not second
+
+    assert _make_cache_key((first, first), {}) == _make_cache_key((first, second), {})
+    assert _make_cache_key((), {"a": 1, "b": 2}) == _make_cache_key((), {"b": 2, "a": 1})
+    assert _make_cache_key((1,), {}) != _make_cache_key((2,), {})
+
+
+class StaleCounter:
+    def __init__(self):
+        self.calls = 0
+
+    @with_cache(ttl_seconds=10, maxsize=2, stale_ttl_seconds=100)
+    async def double(self, value: int) -> dict:
+        self.calls += 1
+        return {"value": value * 2, "call": self.calls}
+
+
+def test_with_cache_stale_refresh_replaces_entry_in_full_cache(monkeypatch):
+    # reject every new result once the cache is full, a refresh of a cached key must still land
+    monkeypatch.setattr(decorators.random, "random", lambda: float("inf"))
+    clock = [1000.0]
+    monkeypatch.setattr(decorators.time, "monotonic", lambda: clock[0])
+    counter = StaleCounter()
+
+    async def run():
+        await counter.double(0)
+        await counter.double(1)
+        clock[0] += 20  # past the TTL, within the stale window
+
+        stale = await counter.double(0)
+        # let the background refresh finish
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return stale, [await counter.double(0) for _ in range(5)]
+
+    stale, hits = asyncio.run(run())
+
+    assert stale == {"value": 0, "call": 1}
+    assert hits == [{"value": 0, "call": 3}] * 5
+    assert counter.calls == 3